@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import time
+import pygame
+
+from base_scene import BaseScene
+from game_scene import GameScene
+from difficulty import TICK_RATE
+from bot import Bot
+import render
+
+REDRAW_FPS = 10 # most redraws per second, and only if something moved
+BOT_MOVE_TICKS = 6 # ticks between the bot's moves
+MAX_TICKS_PER_UPDATE = 10
+
+
+class AttractScene(BaseScene):
+	"""
+	Plays a game by itself while nobody is at the cabinet, either the bot
+	or a recorded list of GameRules snapshots, and goes back to the title
+	screen on any input.
+	"""
+
+	def __init__(self, title_scene, snapshots=None):
+		super().__init__()
+		self.title_scene = title_scene
+		self.snapshots = iter(snapshots) if snapshots is not None else None
+
+		self.game = GameScene() # only used for its rules and drawing
+		self.bot = Bot(self.game)
+		self.bot_ticks = 0
+
+		self.last_update_time = time.perf_counter()
+		self.tick_time = 0
+
+		# layers are redrawn only when what is on them changes
+		self.background = None
+		self.board_layer = None
+		self.drawn_board = None
+		self.drawn_state = None
+		self.last_draw_time = 0
+
+
+	def process_inputs(self, events, pressed_keys):
+		for event in events:
+			if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+				self.title_scene.return_from_attract()
+				self.switch_to_scene(self.title_scene)
+				return
+
+
+	def update(self):
+		now = time.perf_counter()
+		self.tick_time += now - self.last_update_time
+		self.last_update_time = now
+		ticks = 0
+		while self.tick_time >= 1 / TICK_RATE and ticks < MAX_TICKS_PER_UPDATE:
+			self.tick_time -= 1 / TICK_RATE
+			ticks += 1
+			self.step()
+		self.tick_time = min(self.tick_time, 1 / TICK_RATE)
+
+
+	def step(self):
+		game = self.game
+		if self.snapshots is not None:
+			# recorded games are played back at one snapshot per bot move
+			self.bot_ticks += 1
+			if self.bot_ticks >= BOT_MOVE_TICKS:
+				self.bot_ticks = 0
+				snapshot = next(self.snapshots, None)
+				if snapshot is None:
+					self.snapshots = None
+				else:
+					game.restore(snapshot)
+			return
+
+		self.bot_ticks += 1
+		if self.bot_ticks >= BOT_MOVE_TICKS:
+			self.bot_ticks = 0
+			action = self.bot.next_action()
+			if not game.apply_action(action) and action != 'drop':
+				self.bot.blocked()
+		if game.tick() is not None and not game.spawn_piece():
+			# start again forever
+			self.game = GameScene()
+			self.bot = Bot(self.game)
+
+
+	def get_state(self):
+		game = self.game
+		return (game.board, game.falling_piece.get_state(), game.next_piece.get_state(), game.score)
+
+
+	def idle_timeout(self):
+		# the rules catch up on the ticks missed while sleeping
+		return 1000 // REDRAW_FPS
+
+
+	def display(self, screen):
+		now = time.perf_counter()
+		self.needs_flip = False
+		if now - self.last_draw_time < 1 / REDRAW_FPS:
+			return
+		state = self.get_state()
+		if state == self.drawn_state:
+			return
+		self.drawn_state = state
+		self.last_draw_time = now
+		self.needs_flip = True
+
+		game = self.game
+		if self.background is None:
+			self.background = self.draw_background(screen)
+		if game.board is not self.drawn_board:
+			self.board_layer = self.background.copy()
+			for y, row in enumerate(game.board):
+				for x, cell in enumerate(row):
+					game.draw_box(self.board_layer, x, y, cell)
+			self.drawn_board = game.board
+
+		screen.blit(self.board_layer, (0, 0))
+		if game.falling_piece is not None:
+			game.falling_piece.draw(screen, game)
+		next_area = game.next_rect
+		next_piece = game.next_piece
+		center_x = game.box_size * next_piece.width / 2
+		center_y = game.box_size * next_piece.height / 2
+		next_piece.draw(screen, game, pixel_x=next_area.center[0]-center_x, pixel_y=next_area.center[1]-center_y)
+		game.draw_status(screen)
+
+
+	def draw_background(self, screen):
+		# everything that never changes, drawn once
+		game = self.game
+		surface = render.new_layer(screen.get_size())
+		surface.fill((0, 0, 0))
+		game.draw_board(surface, draw_cells=False)
+		game.draw_space(surface)
+		game.draw_next_piece(surface, draw_piece=False)
+		game.draw_buttons(surface)
+		return surface
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import threading
+
+import pygame
+
+# mixer settings, must be applied with pre_init() before pygame.init()
+FREQUENCY = 44100
+SAMPLE_SIZE = -16
+STEREO = 2
+BUFFER_SIZE = 1024 # samples, bigger = less underruns but more latency
+
+VOLUME = .5
+
+# mixer channels reserved for each category of sound
+CATEGORIES = {
+	'lock': 2,
+	'line': 2,
+	'ui': 1,
+}
+
+SOUNDS = ['over', 'rotate', 'select', 'break']
+SONGS = ['song 2']
+
+ASSET_DIR = os.path.join(os.getcwd(), 'assets')
+
+_buffer_size = BUFFER_SIZE # what pre_init() last asked the mixer for
+
+
+def pre_init(frequency=FREQUENCY, size=SAMPLE_SIZE, channels=STEREO, buffer=BUFFER_SIZE):
+	global _buffer_size
+	pygame.mixer.pre_init(frequency, size, channels, buffer)
+	_buffer_size = buffer
+
+
+class AudioManager:
+
+
+	def __init__(self, categories=CATEGORIES):
+		self.categories = categories
+		self.pools = {}
+		self.next_channel = {}
+
+		# filled in by the loading thread
+		self.sounds = {}
+		self.songs = {}
+		self.loaded = threading.Event()
+
+		# requests made during a frame, played by flush()
+		self.pending = {}
+		self.pending_lock = threading.Lock() # play() can be called from the simulation thread
+
+		self.song = None
+		self.current_song = None
+		self.music_paused = False
+		self.actual_music_paused = False
+
+
+	@property
+	def latency(self):
+		# seconds of audio held in the mixer buffer
+		settings = pygame.mixer.get_init()
+		if settings is None:
+			return 0
+		return _buffer_size / settings[0]
+
+
+	def start(self, asset_dir=ASSET_DIR):
+		# give each category its own channels so they can't steal from each other
+		reserved = sum(self.categories.values())
+		if pygame.mixer.get_num_channels() < reserved:
+			pygame.mixer.set_num_channels(reserved)
+		pygame.mixer.set_reserved(reserved)
+		i = 0
+		for category, count in self.categories.items():
+			self.pools[category] = [pygame.mixer.Channel(i + n) for n in range(count)]
+			self.next_channel[category] = 0
+			i += count
+
+		thread = threading.Thread(target=self.load, args=(asset_dir,), daemon=True)
+		thread.start()
+
+
+	def load(self, asset_dir):
+		for name in SOUNDS:
+			sound = pygame.mixer.Sound(os.path.join(asset_dir, f'{name}.ogg'))
+			sound.set_volume(VOLUME)
+			self.sounds[name] = sound
+		# music is streamed by the mixer, so only read the file here
+		for name in SONGS:
+			with open(os.path.join(asset_dir, f'{name}.ogg'), 'rb') as file:
+				self.songs[name] = file.read()
+		self.loaded.set()
+
+
+	def play(self, name, category):
+		# the same sound asked for twice in one frame is only played once
+		with self.pending_lock:
+			self.pending[name] = category
+
+
+	def play_music(self, name):
+		self.song = name
+		self.current_song = None # restart even if it is the same song
+		self.music_paused = False
+
+
+	def pause_music(self):
+		self.music_paused = True
+
+
+	def unpause_music(self):
+		self.music_paused = False
+
+
+	def get_channel(self, category):
+		pool = self.pools[category]
+		for channel in pool:
+			if not channel.get_busy():
+				return channel
+		# every channel is busy, so cut off the oldest sound
+		i = self.next_channel[category]
+		self.next_channel[category] = (i + 1) % len(pool)
+		return pool[i]
+
+
+	def flush(self):
+		# called once per frame by the main loop
+		with self.pending_lock:
+			pending, self.pending = self.pending, {}
+		if not self.pools:
+			return
+
+		for name, category in pending.items():
+			sound = self.sounds.get(name)
+			if sound is None:
+				continue # still loading, drop it
+			self.get_channel(category).play(sound)
+
+		if self.song is not None and self.current_song != self.song and self.song in self.songs:
+			pygame.mixer.music.load(io.BytesIO(self.songs[self.song]), 'ogg')
+			pygame.mixer.music.play(-1)
+			self.current_song = self.song
+			self.actual_music_paused = False
+
+		if self.music_paused != self.actual_music_paused:
+			if self.music_paused:
+				pygame.mixer.music.pause()
+			else:
+				pygame.mixer.music.unpause()
+			self.actual_music_paused = self.music_paused
+
+
+AUDIO = AudioManager()
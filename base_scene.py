@@ -1,10 +1,21 @@
 #!/usr/bin/env python3
 
+import pygame
+
+# the only events put on the queue while a scene is active, so floods of
+# others (like mouse motion) don't slow down getting the ones that matter.
+# WINDOWEXPOSED wakes idle scenes to show their frame again when uncovered
+ALLOWED_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+	pygame.WINDOWFOCUSLOST, pygame.WINDOWFOCUSGAINED, pygame.WINDOWEXPOSED)
 
 class BaseScene:
 
+	allowed_events = ALLOWED_EVENTS
+
 	def __init__(self):
 		self.next = self
+		# set to False by display() when it drew nothing new, so the screen isn't flipped
+		self.needs_flip = True
 
 
 	def process_inputs(self, events, pressed_keys):
@@ -19,6 +30,16 @@ class BaseScene:
 		raise NotImplementedError
 
 
+	def idle_timeout(self):
+		# milliseconds the main loop can sleep waiting for input, None to not sleep
+		return None
+
+
+	def flipped(self):
+		# called by the main loop once what display() drew is on screen
+		pass
+
+
 	def switch_to_scene(self, next_scene):
 		self.next = next_scene
 
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Prints how many bytes each Piece and Cloud takes up.
+
+python bench_memory.py [count]
+"""
+
+import os
+import sys
+import random
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+pygame.init()
+
+from piece import Piece, SHAPES, COLORS
+from clouds import Cloud, get_small_image
+
+
+def bytes_per_object(make, count):
+	objects = []
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	for i in range(count):
+		objects.append(make(i))
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+	size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+	# don't count the list holding the objects
+	size -= sys.getsizeof(objects)
+	return size / count
+
+
+def main(count=10000):
+	shapes = list(SHAPES.values())
+	# rotation tables and the small cloud image are shared, so make them first
+	for shape in shapes:
+		Piece(0, 0, shape, 'red', 20)
+	get_small_image()
+
+	results = [
+		('Piece (board)', lambda i: Piece(5, -2, shapes[i % len(shapes)], COLORS[i % len(COLORS)], 20, i % 4)),
+		('Piece (opening)', lambda i: Piece(i, -20, '*', COLORS[i % len(COLORS)], 20)),
+		('Cloud', lambda i: Cloud(get_small_image(), 0, i % 400)),
+	]
+	for name, make in results:
+		print('%-16s %6.1f bytes' % (name, bytes_per_object(make, count)))
+
+
+if __name__ == '__main__':
+	random.seed(0)
+	main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+A simple computer player. For every rotation and column it drops the
+piece, scores the board it would leave and goes for the best one.
+"""
+
+# weights for scoring a board, higher scores are better
+HEIGHT_WEIGHT = -.51
+LINES_WEIGHT = .76
+HOLES_WEIGHT = -.36
+BUMPINESS_WEIGHT = -.18
+
+
+def evaluate(game, lines):
+	heights = []
+	holes = 0
+	for x in range(game.board_width):
+		height = 0
+		for y in range(game.board_height):
+			if game.board[y][x] is not None:
+				if not height:
+					height = game.board_height - y
+			elif height:
+				holes += 1
+		heights.append(height)
+	bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+	return (HEIGHT_WEIGHT * sum(heights) + LINES_WEIGHT * lines
+		+ HOLES_WEIGHT * holes + BUMPINESS_WEIGHT * bumpiness)
+
+
+def find_placement(game):
+	"""
+	Returns the (rotation, x) to drop the falling piece from, or None.
+	The game is left the way it was, though the piece objects are replaced.
+	"""
+	start = game.snapshot()
+	best = None
+	best_score = None
+	for turns in range(4):
+		for x in range(-3, game.board_width):
+			game.restore(start)
+			piece = game.falling_piece
+			if not all(piece.try_rotate(game) for i in range(turns)):
+				break
+			step = 1 if x > piece.x else -1
+			while piece.x != x and piece.try_move(game, step, 0):
+				pass
+			if piece.x != x:
+				continue
+			while piece.try_move(game, 0, 1):
+				pass
+			rotation = piece.rotation
+			score = evaluate(game, game.lock_piece())
+			if best_score is None or score > best_score:
+				best, best_score = (rotation, x), score
+	game.restore(start)
+	return best
+
+
+class Bot:
+	"""Hands out one action at a time to move the falling piece where it should go"""
+
+	def __init__(self, game):
+		self.game = game
+		self.piece = None
+		self.target = None
+
+
+	def next_action(self):
+		game = self.game
+		if game.falling_piece is not self.piece:
+			self.target = find_placement(game)
+			self.piece = game.falling_piece
+		if self.target is None:
+			return 'drop'
+		rotation, x = self.target
+		piece = self.piece
+		if piece.rotation != rotation:
+			return 'rotate'
+		if piece.x < x:
+			return 'right'
+		if piece.x > x:
+			return 'left'
+		return 'drop'
+
+
+	def blocked(self):
+		# the planned move didn't work, so just drop from here
+		self.target = None
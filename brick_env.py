@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+A gym style environment for training agents on the game rules.
+
+	env = BrickRainEnv(seed=1)
+	observation = env.reset()
+	while True:
+		observation, reward, done, info = env.step(env.action_space.index('drop'))
+		if done:
+			break
+
+Every array in the observation is a view into one buffer that is
+allocated once, so it changes in place after each step. Copy it if you
+need to keep it.
+"""
+
+import numpy as np
+
+from game_rules import GameRules, BOARD_SIZE, ACTIONS
+from randomizer import LOOKAHEAD, get_shape_id
+
+
+class BrickRainEnv:
+	"""
+	Each step does one action and then lets the falling piece fall one row.
+	The reward is the lines cleared times the level they were cleared at.
+	"""
+
+	action_space = ACTIONS
+
+
+	def __init__(self, board_size=BOARD_SIZE, randomizer='random', lookahead=LOOKAHEAD, seed=None):
+		self.board_size = board_size
+		self.randomizer = randomizer
+		self.lookahead = lookahead
+		self.seed = seed
+
+		width, height = board_size
+		queue_size = (lookahead + 1) * 2 # the next piece and the queue, shape and rotation
+		self.buffer = np.zeros(height*width + 4 + queue_size, dtype=np.int16)
+
+		# the observation arrays all share self.buffer
+		end = height * width
+		self.observation = {
+			'board': self.buffer[:end].reshape(height, width),
+			'piece': self.buffer[end:end+4], # shape, rotation, x, y
+			'queue': self.buffer[end+4:].reshape(lookahead + 1, 2),
+		}
+
+		self.game = None
+		self.rows = None
+		self.done = True
+
+
+	def reset(self, seed=None):
+		if seed is None:
+			seed = self.seed
+		self.game = GameRules(self.board_size, seed, self.randomizer, self.lookahead)
+		self.rows = [None] * self.game.board_height
+		self.done = False
+		self.update_observation()
+		return self.observation
+
+
+	def step(self, action):
+		if self.done:
+			raise RuntimeError('step() called after the game ended, call reset()')
+		game = self.game
+		piece = game.falling_piece
+		game.apply_action(ACTIONS[action])
+
+		reward = 0
+		removed_lines = 0
+		# natural fall
+		if not piece.try_move(game, 0, 1):
+			level = game.level
+			removed_lines = game.lock_piece()
+			reward = removed_lines * level
+			self.done = not game.spawn_piece()
+
+		self.update_observation()
+		info = {
+			'lines': removed_lines,
+			'score': game.score,
+			'level': game.level,
+			'gravity': game.speed.gravity,
+		}
+		return self.observation, reward, self.done, info
+
+
+	def update_observation(self):
+		game = self.game
+		board = self.observation['board']
+		# rows are only replaced when they change, so unchanged ones are skipped
+		for y, row in enumerate(game.board):
+			if row is not self.rows[y]:
+				for x, cell in enumerate(row):
+					board[y, x] = cell is not None
+				self.rows[y] = row
+
+		piece = game.falling_piece
+		observed = self.observation['piece']
+		observed[0] = get_shape_id(piece)
+		observed[1] = piece.rotation
+		observed[2] = piece.x
+		observed[3] = piece.y
+
+		queue = self.observation['queue']
+		queue[0, 0] = get_shape_id(game.next_piece)
+		queue[0, 1] = game.next_piece.rotation
+		for i, (shape, rotation, color) in enumerate(game.queue.queue):
+			queue[i+1, 0] = shape
+			queue[i+1, 1] = rotation
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Keeps the last few seconds of play so they can be saved as a clip.
+
+Frames are shrunk into a ring of surfaces made once, so capturing never
+allocates and memory is bounded by MAX_MEMORY. Saving hands the ring's
+surfaces to a background thread and starts a new ring, so the game loop
+never waits on encoding. Clips are videos if ffmpeg is installed,
+otherwise folders of PNGs (see headless.py).
+
+python clips.py [frames] - times capturing a game frame
+"""
+
+import os
+import sys
+import time
+import shutil
+import threading
+import uuid
+
+import pygame
+
+from headless import open_sink
+from telemetry import TELEMETRY
+
+CLIP_DIR = 'clips'
+CLIP_SECONDS = 10
+CLIP_FPS = 15 # frames kept a second, fewer than are drawn
+SCALE = 0.5
+MAX_MEMORY = 32 * 1024 * 1024 # bytes of frames kept at most, fewer seconds are kept if more are needed
+FFMPEG = shutil.which('ffmpeg')
+
+_instant_replay = None
+
+
+def get_instant_replay():
+	# one ring shared by every game, so a clip can run across a retry
+	global _instant_replay
+	if _instant_replay is None:
+		_instant_replay = InstantReplay()
+	return _instant_replay
+
+
+class InstantReplay:
+
+	def __init__(self, seconds=CLIP_SECONDS, fps=CLIP_FPS, scale=SCALE, max_memory=MAX_MEMORY):
+		self.seconds = seconds
+		self.fps = fps
+		self.scale = scale
+		self.max_memory = max_memory
+		self.size = None # set by the first frame, as are the slots
+		self.slots = []
+		self.next_slot = 0
+		self.count = 0 # frames in the ring
+		self.last_capture = 0
+		self.lock = threading.Lock() # games on the simulation thread save while frames are captured
+		self.enabled = True
+
+		# capture cost
+		self.captures = 0
+		self.capture_time = 0.0
+		self.slowest_capture = 0.0
+
+
+	def setup(self, screen):
+		width, height = screen.get_size()
+		# encoders want even sizes
+		self.size = (int(width * self.scale) // 2 * 2, int(height * self.scale) // 2 * 2)
+		frame_bytes = self.size[0] * self.size[1] * screen.get_bytesize()
+		self.slots = [None] * max(1, min(self.seconds * self.fps, self.max_memory // frame_bytes))
+
+
+	def capture(self, screen):
+		# called with every frame drawn, only keeps CLIP_FPS of them
+		if not self.enabled:
+			return
+		if not isinstance(screen, pygame.Surface):
+			return # the texture renderer's frames are on the GPU
+		now = time.perf_counter()
+		if now - self.last_capture < 1 / self.fps:
+			return
+		self.last_capture = now
+		with self.lock:
+			if self.size is None:
+				self.setup(screen)
+			slot = self.slots[self.next_slot]
+			if slot is None:
+				# scaling into a surface needs it to be like the screen
+				slot = self.slots[self.next_slot] = pygame.Surface(self.size, 0, screen)
+			pygame.transform.scale(screen, self.size, slot)
+			self.next_slot = (self.next_slot + 1) % len(self.slots)
+			self.count = min(self.count + 1, len(self.slots))
+		took = time.perf_counter() - now
+		self.captures += 1
+		self.capture_time += took
+		self.slowest_capture = max(self.slowest_capture, took)
+
+
+	def save(self, folder=CLIP_DIR):
+		# returns the path the clip is being written to, None if there is nothing to save
+		with self.lock:
+			if not self.count:
+				return None
+			start = self.next_slot - self.count
+			frames = [self.slots[i % len(self.slots)] for i in range(start, self.next_slot)]
+			# the saver gets these surfaces, new ones are made as the ring fills up again
+			self.slots = [None] * len(self.slots)
+			self.next_slot = 0
+			self.count = 0
+
+		os.makedirs(folder, exist_ok=True)
+		# two saves in the same second mustn't write to the same clip
+		name = time.strftime('clip-%Y%m%d-%H%M%S') + '-%s' % uuid.uuid4().hex[:6]
+		path = os.path.join(folder, name + '.mp4' if FFMPEG else name)
+		# not a daemon, so quitting waits for the clip to be finished
+		thread = threading.Thread(target=write_clip, args=(frames, path, self.size, self.fps))
+		thread.start()
+		TELEMETRY.emit('clip', frames=len(frames), **self.cost())
+		return path
+
+
+	def cost(self):
+		# milliseconds spent capturing a frame
+		mean = self.capture_time / self.captures if self.captures else 0
+		return {'capture_ms': round(mean * 1000, 3), 'slowest_capture_ms': round(self.slowest_capture * 1000, 3)}
+
+
+def write_clip(frames, path, size, fps):
+	sink = open_sink(path, size, fps)
+	for frame in frames:
+		sink.write(frame)
+	sink.close()
+
+
+if __name__ == '__main__':
+	from headless import init_pygame
+	screen = init_pygame()
+	from game_scene import GameScene
+	frames = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+	game = GameScene()
+	game.display(screen)
+	ring = InstantReplay()
+	for i in range(frames):
+		ring.last_capture = 0 # capture every frame
+		ring.capture(screen)
+	print('%d frames of %dx%d kept, %.1f MB' % (len(ring.slots), *ring.size, len(ring.slots) * ring.size[0] * ring.size[1] * screen.get_bytesize() / 1024**2))
+	print('capture: mean %(capture_ms).3f ms, slowest %(slowest_capture_ms).3f ms' % ring.cost())
+	start = time.perf_counter()
+	path = ring.save()
+	print('save returned in %.3f ms, writing %s' % ((time.perf_counter() - start) * 1000, path))
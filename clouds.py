@@ -5,60 +5,172 @@ import pygame
 import random
 
 from game_resources import IMAGES
+import render
+
+FLOAT_STEP = 0.05 # how far through floating up a cloud gets each update
+TRANSPARENT = (0, 0, 0, 0)
+
+
+_small_image = None
+
+
+def get_small_image():
+	# the half size cloud is only scaled once
+	global _small_image
+	if _small_image is None:
+		rect = IMAGES['cloud'].get_rect()
+		_small_image = pygame.transform.scale(IMAGES['cloud'], (rect.width//2, rect.height//2))
+	return _small_image
+
+
+class Cloud:
+	"""A cloud's image and where it is on its CloudLayer's surface"""
+
+	__slots__ = ('image', 'x', 'y', 'start_y', 'stop_y', 'percent')
+
+
+	def __init__(self, image, x, y):
+		self.image = image
+		self.x = x
+		self.y = y
+
+		# values for easing, percent is None when not floating
+		self.start_y = 0
+		self.stop_y = 0
+		self.percent = None
+
+
+	def start_floating(self):
+		self.start_y = self.y
+		self.stop_y = self.start_y - random.randint(10, 40)
+		self.percent = 0
+
+
+	# returns False once the cloud has stopped floating
+	def float(self):
+		self.y = round(self.start_y + ((self.stop_y-self.start_y) * self.percent))
+		self.percent += FLOAT_STEP
+		return self.percent <= 1
+
+
+class CloudLayer:
+	"""
+	All the clouds that move at one speed. Instead of moving every cloud each
+	update, clouds are drawn once onto a surface wider than the view, and
+	the surface is scrolled. When it has scrolled a whole view width the
+	clouds still showing are drawn onto it again, shifted back.
+	"""
+
+	def __init__(self, view, updates_per_pixel, margin):
+		self.view = view
+		self.updates_per_pixel = updates_per_pixel
+		self.updates = 0
+		self.span = view.width # how far it scrolls before drawing the clouds again
+		self.margin = margin # room on the left for clouds starting off screen
+		self.scroll = 0
+		self.surface = pygame.Surface((view.right + self.span + margin, view.bottom), pygame.SRCALPHA)
+		self.surface.fill(TRANSPARENT)
+		self.clouds = []
+		self.floating = [] # clouds being moved, which aren't on the surface
+
+
+	def origin(self):
+		# screen x of the left edge of the surface
+		return self.scroll - self.span - self.margin
+
+
+	def add(self, image, location):
+		rect = image.get_rect(center=location)
+		cloud = Cloud(image, rect.x - self.origin(), rect.y)
+		self.clouds.append(cloud)
+		self.surface.blit(cloud.image, (cloud.x, cloud.y))
+		render.changed(self.surface)
+
+
+	def redraw(self):
+		self.surface.fill(TRANSPARENT)
+		for cloud in self.clouds:
+			self.surface.blit(cloud.image, (cloud.x, cloud.y))
+		render.changed(self.surface)
 
 
-class Cloud(pygame.sprite.Sprite):
-
-
-	def __init__(self, location, min_x, max_x):
-		pygame.sprite.Sprite.__init__(self)
-		
-		self.min_x = min_x
-		self.max_x = max_x
-		
-		self.image = IMAGES['cloud']
-		self.rect = self.image.get_rect()
-		
-		self.double_speed = bool(random.randint(0,1))
-		
-		self.begin_floating = False
-		self.floating = False
-		
-		if not self.double_speed:
-			self.image = pygame.transform.scale(self.image, (self.rect.width//2, self.rect.height//2))
-			self.rect = self.image.get_rect()
-			self.should_move = True
-		
-		self.rect.center = location
-		
-		
-	def float_on_click(self):
-		if pygame.mouse.get_pressed()[0]:
-			if self.rect.collidepoint(pygame.mouse.get_pos()):
-				self.begin_floating = True
-		# only run this block once
-		if self.begin_floating:
-			# need values for easing
-			self.start_y = self.rect.centery
-			self.stop_y = self.start_y - random.randint(10, 40)
-			self.step = 0.05
-			self.percent = 0
-			self.floating = True
-		if self.floating:
-			self.begin_floating = False
-			if self.percent <= 1:
-				self.rect.centery = self.start_y + ((self.stop_y-self.start_y) * self.percent)
-				self.percent += self.step
-				
-				
 	def update(self):
-		self.float_on_click()
-		if self.double_speed:
-			self.rect.x += 1
+		self.updates += 1
+		if self.updates >= self.updates_per_pixel:
+			self.updates = 0
+			self.scroll += 1
+			if self.scroll >= self.span:
+				# wrap around, dropping clouds that have floated off the view
+				self.scroll = 0
+				for cloud in self.clouds + self.floating:
+					cloud.x += self.span
+				right = self.view.right - self.origin()
+				self.clouds = [cloud for cloud in self.clouds if cloud.x <= right]
+				self.redraw()
+
+		if self.floating:
+			still_floating = []
+			for cloud in self.floating:
+				if cloud.float():
+					still_floating.append(cloud)
+				else:
+					self.clouds.append(cloud)
+					self.surface.blit(cloud.image, (cloud.x, cloud.y))
+					render.changed(self.surface)
+			self.floating = still_floating
+
+
+	def click(self, pos):
+		# clicked clouds float up, they are drawn on their own while they move
+		x = pos[0] - self.origin()
+		clicked = [cloud for cloud in self.clouds if cloud.image.get_rect(topleft=(cloud.x, cloud.y)).collidepoint(x, pos[1])]
+		if not clicked:
+			return
+		for cloud in clicked:
+			self.clouds.remove(cloud)
+			cloud.start_floating()
+		self.floating.extend(clicked)
+		self.redraw()
+
+
+	def draw(self, screen):
+		origin = self.origin()
+		view = self.view
+		screen.blit(self.surface, view.topleft, (view.x - origin, view.y, view.width, view.height))
+		if self.floating:
+			clip = screen.get_clip()
+			screen.set_clip(view)
+			for cloud in self.floating:
+				screen.blit(cloud.image, (cloud.x + origin, cloud.y))
+			screen.set_clip(clip)
+
+
+class CloudBackground:
+	"""Big clouds in front moving every update, small ones behind moving every other update"""
+
+	def __init__(self, view):
+		margin = IMAGES['cloud'].get_width()
+		self.near = CloudLayer(view, 1, margin)
+		self.far = CloudLayer(view, 2, margin)
+
+
+	def add(self, location):
+		if random.randint(0, 1):
+			self.near.add(IMAGES['cloud'], location)
 		else:
-			if self.should_move:
-				self.rect.x += 1
-			self.should_move = not self.should_move # move every other tick
-				
-		if self.rect.left > self.max_x:
-			self.kill()
\ No newline at end of file
+			self.far.add(get_small_image(), location)
+
+
+	def update(self):
+		self.far.update()
+		self.near.update()
+
+
+	def click(self, pos):
+		self.far.click(pos)
+		self.near.click(pos)
+
+
+	def draw(self, screen):
+		self.far.draw(screen)
+		self.near.draw(screen)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+How fast pieces fall at each level.
+
+The game rules tick TICK_RATE times a second no matter how fast the
+screen is drawn, and pieces fall by a fraction of a row each tick, so
+every level plays the same on every machine, even when a piece falls
+more than one row in a tick.
+"""
+
+from collections import namedtuple
+
+TICK_RATE = 60 # game rule ticks per second
+ROW = 65536 # speeds are in 1/ROW of a row per tick
+LINES_PER_LEVEL = 10
+
+# rows fallen per second for each level, starting at level 1
+# up to 20 this matches the old formula (one row every .45 - level*.02 seconds)
+FALL_SPEEDS = [1 / (.45 - level*.02) for level in range(1, 21)] + [
+	40, 60, 90, 135, 200, 300, 450, 675, 1000, 1200,
+]
+
+SOFT_DROP_SPEED = 5 # extra rows per second while holding down
+MAX_LOCK_DELAY = .5 # seconds a landed piece can still move before it locks
+MIN_LOCK_DELAY = .25
+
+# survival mode pushes up a garbage row this often, a bit sooner each level
+GARBAGE_DELAY = 8 # seconds at level 1
+GARBAGE_SPEEDUP = .8
+MIN_GARBAGE_DELAY = .2
+
+# gravity and soft_drop are in 1/ROW of a row per tick, lock_delay and garbage_delay are in ticks
+Speed = namedtuple('Speed', 'gravity soft_drop lock_delay garbage_delay')
+
+
+def make_table(fall_speeds=FALL_SPEEDS):
+	table = []
+	for level, rows_per_second in enumerate(fall_speeds):
+		gravity = round(rows_per_second * ROW / TICK_RATE)
+		soft_drop = round((rows_per_second + SOFT_DROP_SPEED) * ROW / TICK_RATE)
+		# about as long as it takes to fall one row, within limits
+		lock_delay = min(max(1 / rows_per_second, MIN_LOCK_DELAY), MAX_LOCK_DELAY)
+		garbage_delay = max(GARBAGE_DELAY * GARBAGE_SPEEDUP**level, MIN_GARBAGE_DELAY)
+		table.append(Speed(gravity, soft_drop, round(lock_delay * TICK_RATE), round(garbage_delay * TICK_RATE)))
+	return tuple(table)
+
+
+SPEEDS = make_table()
+
+
+def get_level(score):
+	return int(score / LINES_PER_LEVEL) + 1
+
+
+def get_speed(level):
+	# levels past the end of the table keep the last speed
+	return SPEEDS[min(max(level, 1), len(SPEEDS)) - 1]
+
+
+if __name__ == '__main__':
+	print('level  rows/sec  soft drop  lock delay (s)  garbage delay (s)')
+	for level, speed in enumerate(SPEEDS, 1):
+		print('%5d %9.2f %10.2f %15.2f %18.2f' % (level, speed.gravity * TICK_RATE / ROW,
+			speed.soft_drop * TICK_RATE / ROW, speed.lock_delay / TICK_RATE, speed.garbage_delay / TICK_RATE))
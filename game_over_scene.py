@@ -3,12 +3,15 @@
 import pygame
 
 from base_scene import BaseScene
-from game_resources import SOUNDS
+from audio import AUDIO
+from render import draw_rect, render_text
 
 
 BIG_FONT = pygame.font.Font('freesansbold.ttf', 25)
 NORMAL_FONT = pygame.font.Font('freesansbold.ttf', 15)
 
+IDLE_TIMEOUT = 1000
+
 
 class GameOverScene(BaseScene):
 
@@ -22,8 +25,8 @@ class GameOverScene(BaseScene):
 		self.retry_button = pygame.Rect(100, 250, 150, 30)
 		self.quit_button = pygame.Rect(100, 300, 150, 30)
 
-		pygame.mixer.music.pause()
-		SOUNDS['over'].play()
+		AUDIO.pause_music()
+		AUDIO.play('over', 'ui')
 
 		# only display once
 		self.has_drawn = False
@@ -32,6 +35,7 @@ class GameOverScene(BaseScene):
 	def display(self, screen):
 		# everything here only needs to be displayed once
 		if self.has_drawn:
+			self.needs_flip = False
 			return
 		else:
 			self.has_drawn = True
@@ -39,28 +43,28 @@ class GameOverScene(BaseScene):
 		screen.fill((0,0,0))
 
 		# show game over and score...
-		surf = BIG_FONT.render('GAME OVER', True, (255, 255, 255), (0,0,0))
+		surf = render_text(BIG_FONT, 'GAME OVER', True, (255, 255, 255), (0,0,0))
 		game_over_rect = surf.get_rect()
 		game_over_rect.center = screen.get_rect().center
 		game_over_rect.y = 100
 		screen.blit(surf, game_over_rect)
 
-		surf = NORMAL_FONT.render('Score: %s, Level: %s'%(self.score, self.level), True, (100, 100, 255), (0,0,0))
+		surf = render_text(NORMAL_FONT, 'Score: %s, Level: %s'%(self.score, self.level), True, (100, 100, 255), (0,0,0))
 		surf_rect = surf.get_rect()
 		surf_rect.midtop = game_over_rect.midbottom
 		screen.blit(surf, surf_rect)
 
 		# draw buttons with text
-		pygame.draw.rect(screen, (0, 0, 255), self.retry_button, 5)
-		pygame.draw.rect(screen, (0, 0, 0), self.retry_button)
-		surf = 	NORMAL_FONT.render('Retry (R)', True, (255, 255, 255))
+		draw_rect(screen, (0, 0, 255), self.retry_button, 5)
+		draw_rect(screen, (0, 0, 0), self.retry_button)
+		surf = 	render_text(NORMAL_FONT, 'Retry (R)', True, (255, 255, 255))
 		surf_rect = surf.get_rect()
 		surf_rect.center = self.retry_button.center
 		screen.blit(surf, surf_rect)
 
-		pygame.draw.rect(screen, (255, 0, 0), self.quit_button, 5)
-		pygame.draw.rect(screen, (0, 0, 0), self.quit_button)
-		surf = 	NORMAL_FONT.render('Quit (Esc)', True, (255, 255, 255))
+		draw_rect(screen, (255, 0, 0), self.quit_button, 5)
+		draw_rect(screen, (0, 0, 0), self.quit_button)
+		surf = 	render_text(NORMAL_FONT, 'Quit (Esc)', True, (255, 255, 255))
 		surf_rect = surf.get_rect()
 		surf_rect.center = self.quit_button.center
 		screen.blit(surf, surf_rect)
@@ -70,6 +74,11 @@ class GameOverScene(BaseScene):
 		pass
 
 
+	def idle_timeout(self):
+		# nothing happens until the player picks something, once the screen is up
+		return IDLE_TIMEOUT if self.has_drawn else None
+
+
 	def process_inputs(self, events, pressed_keys):
 		for event in events:
 			if event.type == pygame.MOUSEBUTTONDOWN:
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+import random
+from collections import namedtuple
+
+from piece import Piece, COLORS
+from randomizer import PieceQueue, FixedQueue, SHAPE_STRINGS, LOOKAHEAD
+from difficulty import ROW, get_level, get_speed
+
+BOARD_SIZE = (10, 20) # rows and columns of game board
+TALL_BOARD_SIZE = (10, 2000) # for a well far deeper than the screen
+
+ACTIONS = ['none', 'left', 'right', 'rotate', 'down', 'drop']
+GARBAGE_COLOR = 'black'
+
+# everything needed to put a game back the way it was, nothing in it is mutable
+Snapshot = namedtuple('Snapshot', 'board board_hash falling_piece next_piece score level')
+
+_zobrist_keys = {}
+
+
+def get_zobrist_keys(width, height):
+	# one random number per box, XOR-ed together for every filled box
+	keys = _zobrist_keys.get((width, height))
+	if keys is None:
+		rand = random.Random(width * 100003 + height) # same keys every run
+		keys = tuple(tuple(rand.getrandbits(64) for x in range(width)) for y in range(height))
+		_zobrist_keys[width, height] = keys
+	return keys
+
+
+class GameRules:
+	"""
+	The board and pieces without anything to do with pygame.
+	The board is a tuple of row tuples that is replaced instead of changed,
+	so snapshots can share it. Empty rows are all the same tuple, and the
+	loops over rows start at the top of the stack, so a very tall board
+	costs about as much as the height of its stack.
+	"""
+
+	box_size = 20
+
+
+	def __init__(self, board_size=BOARD_SIZE, seed=None, randomizer='random', lookahead=LOOKAHEAD, pieces=None):
+		# pieces is a list of SHAPES keys to hand out instead of random ones
+		self.board_width, self.board_height = board_size
+		self.zobrist_keys = get_zobrist_keys(self.board_width, self.board_height)
+		self.empty_row = (None,) * self.board_width
+		self.board = self.get_empty_board()
+		self.board_hash = 0
+		# first row with a box in it, worked out again if the board is replaced from outside
+		self.stack_top = self.board_height
+		self.stack_board = self.board
+
+		self.score = 0
+		self.update_level()
+
+		# how far the piece has fallen into the next row, and how long it has been landed
+		self.fall_progress = 0
+		self.lock_ticks = 0
+		self.ticks = 0 # played so far
+
+		if pieces is not None:
+			self.queue = FixedQueue(pieces)
+		else:
+			self.queue = PieceQueue(randomizer, seed, lookahead)
+		self.falling_piece = self.new_piece()
+		self.next_piece = self.new_piece()
+
+
+	def get_empty_board(self):
+		return (self.empty_row,) * self.board_height
+
+
+	def get_stack_top(self):
+		# the first row with a box in it, board_height if there are none
+		if self.stack_board is not self.board:
+			empty_row = self.empty_row
+			top = 0
+			for row in self.board:
+				if row != empty_row:
+					break
+				top += 1
+			self.stack_top = top
+			self.stack_board = self.board
+		return self.stack_top
+
+
+	def is_on_board(self, x, y):
+		return 0 <= x < self.board_width and y < self.board_height
+
+
+	def new_piece(self):
+		# None if a fixed list of pieces has run out
+		ids = self.queue.pop()
+		if ids is None:
+			return None
+		shape, rotation, color = ids
+		return Piece(int(self.board_width / 2), -2, SHAPE_STRINGS[shape], COLORS[color], self.box_size, rotation)
+
+
+	def apply_action(self, action):
+		# returns whether the falling piece moved
+		piece = self.falling_piece
+		if action == 'left':
+			return piece.try_move(self, -1, 0)
+		elif action == 'right':
+			return piece.try_move(self, 1, 0)
+		elif action == 'rotate':
+			return piece.try_rotate(self)
+		elif action == 'down':
+			return piece.try_move(self, 0, 1)
+		elif action == 'drop':
+			return self.drop(piece)
+		return False
+
+
+	def drop(self, piece):
+		# moves the piece as far down as it goes, returns whether it moved
+		# the rows above the stack are empty, so a piece that fits can skip straight to the stack
+		moved = False
+		gap = self.get_stack_top() - (piece.y + piece.height)
+		if gap > 0 and self.is_valid_position(piece):
+			piece.y += gap
+			moved = True
+		while piece.try_move(self, 0, 1):
+			moved = True
+		return moved
+
+
+	def add_garbage(self, count, gap):
+		"""
+		Pushes rows with one hole in them up from the bottom, and the falling
+		piece with them. Returns False if boxes were pushed off the top.
+		Rows are shared, so only references move. Every row's hash changes,
+		so that is only worked out when something asks for it.
+		"""
+		row = tuple(None if x == gap else GARBAGE_COLOR for x in range(self.board_width))
+		top = self.get_stack_top()
+		self.board = self.board[count:] + (row,) * count
+		self.stack_top = max(0, top - count)
+		self.stack_board = self.board
+		self.board_hash = None
+		if self.falling_piece is not None:
+			self.falling_piece.y -= count
+		return top >= count
+
+
+	@property
+	def board_hash(self):
+		if self._board_hash is None:
+			self._board_hash = self.calculate_board_hash()
+		return self._board_hash
+
+
+	@board_hash.setter
+	def board_hash(self, value):
+		# None to have it worked out when it's next needed
+		self._board_hash = value
+
+
+	def lock_piece(self):
+		# returns how many lines the falling piece completed
+		self.add_to_board(self.falling_piece)
+		removed_lines = self.remove_complete_lines()
+		self.score += removed_lines
+		self.update_level()
+		self.falling_piece = None
+		return removed_lines
+
+
+	def update_level(self):
+		self.level = get_level(self.score)
+		self.speed = get_speed(self.level)
+
+
+	def tick(self, soft_drop=False):
+		"""
+		Moves the game on by one fixed time step (see difficulty.TICK_RATE).
+		Returns the lines cleared if the piece locked, otherwise None.
+		"""
+		self.ticks += 1
+		piece = self.falling_piece
+		self.fall_progress += self.speed.soft_drop if soft_drop else self.speed.gravity
+		# fast gravity can move a piece more than one row in a tick
+		while self.fall_progress >= ROW:
+			if not piece.try_move(self, 0, 1):
+				self.fall_progress = 0
+				break
+			self.fall_progress -= ROW
+			self.lock_ticks = 0
+
+		if self.fits(piece.cells, piece.x, piece.y + 1):
+			self.lock_ticks = 0
+			return None
+		self.lock_ticks += 1
+		if self.lock_ticks < self.speed.lock_delay:
+			return None
+		return self.lock_piece()
+
+
+	def spawn_piece(self):
+		# returns False if the game is over
+		self.falling_piece = self.next_piece
+		self.next_piece = self.new_piece()
+		self.fall_progress = 0
+		self.lock_ticks = 0
+		if self.falling_piece is None or not self.is_valid_position(self.falling_piece):
+			return False
+		for x in range(3, self.board_width-4):
+			if self.board[0][x] is not None:
+				return False
+		return True
+
+
+	def row_hash(self, y, row):
+		keys = self.zobrist_keys[y]
+		h = 0
+		for x, cell in enumerate(row):
+			if cell is not None:
+				h ^= keys[x]
+		return h
+
+
+	def calculate_board_hash(self):
+		h = 0
+		board = self.board
+		for y in range(self.get_stack_top(), self.board_height):
+			h ^= self.row_hash(y, board[y])
+		return h
+
+
+	def add_to_board(self, piece):
+		top = self.get_stack_top()
+		rows = {}
+		for x, y in piece.cells:
+			x += piece.x
+			y += piece.y
+			# parts still above the board are lost
+			if y < 0:
+				continue
+			if y not in rows:
+				rows[y] = list(self.board[y])
+			if rows[y][x] is None:
+				self.board_hash ^= self.zobrist_keys[y][x]
+			rows[y][x] = piece.color
+		board = list(self.board)
+		for y, row in rows.items():
+			board[y] = tuple(row)
+		self.board = tuple(board)
+		if rows:
+			top = min(top, min(rows))
+		self.stack_top = top
+		self.stack_board = self.board
+
+
+	def is_complete_line(self, y):
+		return None not in self.board[y]
+
+
+	def remove_complete_lines(self):
+		# only rows in the stack can be complete
+		top = self.get_stack_top()
+		old = self.board
+		kept = [row for row in old[top:] if None in row]
+		lines_removed = self.board_height - top - len(kept)
+		if lines_removed:
+			self.board = old[:top] + (self.empty_row,) * lines_removed + tuple(kept)
+			self.stack_top = top + lines_removed
+			self.stack_board = self.board
+			# rows above the stack stay empty and rows below the lowest complete line didn't move
+			lowest = max(y for y in range(top, self.board_height) if None not in old[y])
+			for y in range(top, lowest + 1):
+				self.board_hash ^= self.row_hash(y, old[y]) ^ self.row_hash(y, self.board[y])
+		return lines_removed
+
+
+	def is_valid_position(self, piece, adj_x=0, adj_y=0):
+		return self.fits(piece.cells, piece.x + adj_x, piece.y + adj_y)
+
+
+	def fits(self, cells, x, y):
+		# cells are (x, y) offsets from the piece's position
+		board = self.board
+		for cell_x, cell_y in cells:
+			box_x = x + cell_x
+			if not 0 <= box_x < self.board_width:
+				return False
+			box_y = y + cell_y
+			if box_y < 0:
+				continue # above the board is fine
+			if box_y >= self.board_height or board[box_y][box_x] is not None:
+				return False
+		return True
+
+
+	def snapshot(self):
+		falling = self.falling_piece.get_state() if self.falling_piece is not None else None
+		next_piece = self.next_piece.get_state() if self.next_piece is not None else None
+		return Snapshot(self.board, self.board_hash, falling, next_piece, self.score, self.level)
+
+
+	def restore(self, snapshot):
+		self.board = snapshot.board
+		self.board_hash = snapshot.board_hash # None is worked out when needed
+		if snapshot.falling_piece is None:
+			self.falling_piece = None
+		else:
+			self.falling_piece = Piece.from_state(snapshot.falling_piece, self.box_size)
+		if snapshot.next_piece is None:
+			self.next_piece = None
+		else:
+			self.next_piece = Piece.from_state(snapshot.next_piece, self.box_size)
+		self.score = snapshot.score
+		self.update_level()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Renders games without a window, for making videos on servers.
+
+python headless.py out.mp4 [seed] [frame skip]
+python headless.py frames/ [seed] [frame skip]
+
+A path ending in .mp4/.mkv/.webm is piped to ffmpeg as raw RGB frames,
+anything else is a folder that gets numbered PNGs.
+"""
+
+import os
+import sys
+import time
+import random
+import subprocess
+import multiprocessing
+
+from game_rules import GameRules
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.avi')
+QUEUE_SIZE = 64 # snapshots waiting to be drawn before the simulation waits
+CLOCKED_MODULES = ['game_scene', 'opening_scene', 'attract_scene'] # scenes that move along by the time
+
+
+def init_pygame():
+	# the dummy drivers work without a display or sound card
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+	import pygame
+	pygame.init()
+	from main import SCREEN_WIDTH, SCREEN_HEIGHT
+	pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+	return pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+class VirtualClock:
+	"""
+	Stands in for the time module in the scenes. It starts at the real time
+	so scenes made before it took over carry on from where they were.
+	"""
+
+	def __init__(self):
+		self.start_time = time.time()
+		self.start_counter = time.perf_counter()
+		self.elapsed = 0.0
+
+
+	def time(self):
+		return self.start_time + self.elapsed
+
+
+	def perf_counter(self):
+		return self.start_counter + self.elapsed
+
+
+	def advance(self, seconds):
+		self.elapsed += seconds
+
+
+def use_virtual_clock():
+	# call after init_pygame(), the scene modules need it to import
+	import importlib
+	clock = VirtualClock()
+	for name in CLOCKED_MODULES:
+		importlib.import_module(name).time = clock
+	return clock
+
+
+class EncoderSink:
+	"""Streams raw RGB frames into an encoder's stdin"""
+
+	def __init__(self, path, size, fps):
+		width, height = size
+		command = ['ffmpeg', '-loglevel', 'error', '-y',
+			'-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps),
+			'-i', '-', path]
+		self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+
+	def write(self, surface):
+		import pygame
+		self.process.stdin.write(pygame.image.tobytes(surface, 'RGB'))
+
+
+	def close(self):
+		self.process.stdin.close()
+		self.process.wait()
+
+
+class PNGSink:
+	"""Saves each frame as a numbered PNG"""
+
+	def __init__(self, path, size, fps):
+		self.path = path
+		self.count = 0
+		os.makedirs(path, exist_ok=True)
+
+
+	def write(self, surface):
+		import pygame
+		pygame.image.save(surface, os.path.join(self.path, f'{self.count:06d}.png'))
+		self.count += 1
+
+
+	def close(self):
+		pass
+
+
+def open_sink(path, size, fps):
+	if path.lower().endswith(VIDEO_EXTENSIONS):
+		return EncoderSink(path, size, fps)
+	return PNGSink(path, size, fps)
+
+
+def render_scene(scene, path, frames, fps=30, frame_skip=1):
+	# any scene, drawn in this process
+	# the scenes go by a clock moved a frame at a time, so the video plays at the right speed however long drawing takes
+	surface = init_pygame()
+	clock = use_virtual_clock()
+	from clips import get_instant_replay
+	get_instant_replay().enabled = False # the whole game is being kept already
+	sink = open_sink(path, surface.get_size(), fps // frame_skip)
+	for i in range(frames):
+		if scene is None:
+			break
+		clock.advance(1 / fps)
+		scene.update()
+		if i % frame_skip == 0:
+			scene.display(surface)
+			sink.write(surface)
+		scene = scene.next
+	sink.close()
+
+
+def render_worker(snapshots, path, fps):
+	surface = init_pygame()
+	from game_scene import GameScene
+	from clips import get_instant_replay
+	get_instant_replay().enabled = False
+	sink = open_sink(path, surface.get_size(), fps)
+	scene = GameScene()
+	while True:
+		snapshot = snapshots.get()
+		if snapshot is None:
+			break
+		scene.restore(snapshot)
+		scene.display(surface)
+		sink.write(surface)
+	sink.close()
+
+
+def render_snapshots(snapshots, path, fps=30, frame_skip=1):
+	"""
+	Draws a game from GameRules snapshots, like the ones made while playing
+	or replaying. The snapshots are drawn by another process so the
+	simulation never waits on drawing or encoding unless the queue is full.
+	"""
+	queue = multiprocessing.Queue(QUEUE_SIZE)
+	process = multiprocessing.Process(target=render_worker, args=(queue, path, fps // frame_skip))
+	process.start()
+	for i, snapshot in enumerate(snapshots):
+		if i % frame_skip == 0:
+			queue.put(snapshot)
+	queue.put(None)
+	process.join()
+
+
+def play_random(seed, max_pieces=500):
+	# a game of random moves, one snapshot per row fallen
+	game = GameRules(seed=seed)
+	rand = random.Random(seed)
+	for i in range(max_pieces):
+		while True:
+			yield game.snapshot()
+			piece = game.falling_piece
+			move = rand.randrange(4)
+			if move == 0:
+				piece.try_move(game, -1, 0)
+			elif move == 1:
+				piece.try_move(game, 1, 0)
+			elif move == 2:
+				piece.try_rotate(game)
+			if not piece.try_move(game, 0, 1):
+				break
+		game.lock_piece()
+		if not game.spawn_piece():
+			break
+	yield game.snapshot()
+
+
+if __name__ == '__main__':
+	path = sys.argv[1]
+	seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+	frame_skip = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+	render_snapshots(play_random(seed), path, frame_skip=frame_skip)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Measures how long a key press takes to show up on screen.
+
+A thread posts key presses with pygame.event.post at times taken from a
+seeded schedule, each one carrying the time it was posted, while the real
+main loop runs a game. A probe scene wrapped around the game checks if the
+falling piece changed because of each press, and the first flip after
+that ends the press's measurement. Presses that did nothing (moving into a
+wall) aren't counted. Mouse motion is posted along with every press to
+show it being kept out of the queue.
+
+python latency.py [presses per run] [fps ...]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import threading
+from collections import defaultdict
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import main
+from base_scene import BaseScene
+from game_scene import GameScene
+
+PRESSES = 200
+FPS_SETTINGS = (30, 60, 120)
+GAP = (0.05, 0.25) # seconds between presses
+FLOOD = 50 # mouse motion events posted with each press
+PERCENTILES = (50, 95, 99)
+KEYS = {
+	'left': pygame.K_LEFT,
+	'right': pygame.K_RIGHT,
+	'rotate': pygame.K_UP,
+	'down': pygame.K_DOWN,
+	'drop': pygame.K_SPACE,
+}
+
+
+def make_schedule(presses, seed=0):
+	# (seconds from the start, key name) for each press
+	rand = random.Random(seed)
+	names = sorted(KEYS)
+	schedule = []
+	at = 0.5 # give the loop time to start
+	for i in range(presses):
+		schedule.append((at, rand.choice(names)))
+		at += rand.uniform(*GAP)
+	return schedule
+
+
+def post_presses(schedule, flood=FLOOD):
+	start = time.perf_counter()
+	for at, name in schedule:
+		delay = start + at - time.perf_counter()
+		if delay > 0:
+			time.sleep(delay)
+		for i in range(flood):
+			pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0), rel=(1, 1), buttons=(0, 0, 0)))
+		key = KEYS[name]
+		pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0,
+			probe=name, posted=time.perf_counter()))
+		pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode='', scancode=0))
+
+
+def percentile(values, percent):
+	ordered = sorted(values)
+	return ordered[min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))]
+
+
+class ProbeScene(BaseScene):
+	"""Passes everything on to a game, starting a new one when it ends"""
+
+	def __init__(self, presses):
+		super().__init__()
+		self.presses = presses
+		self.game = GameScene()
+		self.seen = 0
+		self.unchanged = 0
+		self.waiting = [] # (key name, time posted) of presses that changed the game but aren't on screen yet
+		self.latencies = defaultdict(list)
+
+
+	def piece_state(self):
+		piece = self.game.falling_piece
+		return piece.get_state() if piece is not None else None
+
+
+	def process_inputs(self, events, pressed_keys):
+		other = []
+		for event in events:
+			if event.type == pygame.KEYDOWN and hasattr(event, 'probe'):
+				before = self.piece_state()
+				self.game.process_inputs([event], pressed_keys)
+				if self.piece_state() != before:
+					self.waiting.append((event.probe, event.posted))
+				else:
+					self.unchanged += 1
+				self.seen += 1
+			else:
+				other.append(event)
+		self.game.process_inputs(other, pressed_keys)
+
+
+	def update(self):
+		self.game.update()
+		if self.game.next is not self.game:
+			self.game = GameScene()
+
+
+	def display(self, screen):
+		self.game.display(screen)
+		self.needs_flip = self.game.needs_flip
+
+
+	def flipped(self):
+		now = time.perf_counter()
+		for name, posted in self.waiting:
+			self.latencies[name].append(now - posted)
+		self.waiting = []
+		if self.seen >= self.presses:
+			self.terminate()
+
+
+def run(fps, presses=PRESSES):
+	probe = ProbeScene(presses)
+	poster = threading.Thread(target=post_presses, args=(make_schedule(presses),), daemon=True)
+	poster.start()
+	main.main('Brick Rain latency', main.SCREEN_WIDTH, main.SCREEN_HEIGHT, fps, probe)
+	poster.join()
+	return probe
+
+
+def report(fps, probe):
+	print('%d fps (frame %.1f ms), %d presses did nothing' % (fps, 1000 / fps, probe.unchanged))
+	print('  %-8s %6s' % ('key', 'count') + ''.join('%9s' % ('p%d ms' % p) for p in PERCENTILES))
+	everything = []
+	for name in sorted(probe.latencies):
+		values = probe.latencies[name]
+		everything.extend(values)
+		print('  %-8s %6d' % (name, len(values)) + ''.join('%9.1f' % (percentile(values, p) * 1000) for p in PERCENTILES))
+	if everything:
+		print('  %-8s %6d' % ('all', len(everything)) + ''.join('%9.1f' % (percentile(everything, p) * 1000) for p in PERCENTILES))
+
+
+if __name__ == '__main__':
+	presses = int(sys.argv[1]) if len(sys.argv) > 1 else PRESSES
+	fps_settings = [int(arg) for arg in sys.argv[2:]] or FPS_SETTINGS
+	# autosaves and telemetry go somewhere they can't get mixed up with real ones
+	os.chdir(tempfile.mkdtemp(prefix='brick-latency-'))
+	for fps in fps_settings:
+		report(fps, run(fps, presses))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Shares the game being played with other processes, like stream overlays,
+through a block of shared memory.
+
+The game writes into the block after every update without ever waiting
+on readers. A sequence number at the start of the block is made odd
+before a write and even again after it. A reader copies what it wants
+and checks the number was the same even number before and after; if
+not, it reads again. Readers can poll the sequence number alone to see
+if anything changed.
+
+Block layout, little endian:
+	header    magic, version, board capacity in boxes
+	sequence  8 bytes
+	state     width, height, score, level, ticks played, lines per minute,
+	          paused, falling piece and next piece as in savegame.py
+	board     1 byte per box, row by row, 0 for empty, otherwise 1 + index in COLORS
+
+python live_state.py [name] - prints the game as it changes
+"""
+
+import sys
+import time
+import struct
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+from piece import COLORS
+from randomizer import SHAPE_KEYS
+from difficulty import TICK_RATE
+from game_rules import TALL_BOARD_SIZE
+from savegame import pack_piece, NO_PIECE
+
+NAME = 'brick-rain-live'
+MAGIC = b'BRKL'
+VERSION = 1
+CAPACITY = TALL_BOARD_SIZE[0] * TALL_BOARD_SIZE[1] # boxes, taller boards only share their bottom rows
+
+HEADER = struct.Struct('<4sB3xI') # magic, version, capacity
+SEQUENCE = struct.Struct('<Q')
+STATE = struct.Struct('<HHIHId?' + 'BBhhB'*2)
+SEQUENCE_OFFSET = 16
+STATE_OFFSET = SEQUENCE_OFFSET + SEQUENCE.size
+BOARD_OFFSET = STATE_OFFSET + STATE.size
+
+READ_TRIES = 100
+ROW_CACHE_SIZE = 4096
+
+# pieces are (SHAPES key, rotation, x, y, color), or None
+LiveState = namedtuple('LiveState', 'sequence width height score level ticks lines_per_minute paused falling_piece next_piece board')
+
+
+class LiveStateWriter:
+
+	def __init__(self):
+		self.memory = None
+		self.sequence = 0
+		self.board = None # the board last written
+		self.row_codes = {} # row tuple -> bytes
+
+
+	def start(self, name=NAME, capacity=CAPACITY):
+		size = BOARD_OFFSET + capacity
+		try:
+			self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+		except FileExistsError:
+			# left behind by a game that didn't get to clean up
+			old = shared_memory.SharedMemory(name)
+			old.close()
+			old.unlink()
+			self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+		self.capacity = capacity
+		HEADER.pack_into(self.memory.buf, 0, MAGIC, VERSION, capacity)
+		SEQUENCE.pack_into(self.memory.buf, SEQUENCE_OFFSET, 0)
+
+
+	def publish(self, game):
+		# does nothing unless started
+		if self.memory is None:
+			return
+		buf = self.memory.buf
+		width = game.board_width
+		height = min(game.board_height, self.capacity // width)
+		minutes = game.ticks / TICK_RATE / 60
+
+		self.sequence += 1 # odd while writing
+		SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, self.sequence)
+		STATE.pack_into(buf, STATE_OFFSET, width, height, game.score, game.level, game.ticks,
+			game.score / minutes if minutes else 0.0, game.paused or game.helping,
+			*pack_piece(game.falling_piece), *pack_piece(game.next_piece))
+		# the board only changes when a piece locks
+		if game.board is not self.board:
+			rows = game.board[game.board_height - height:]
+			data = b''.join([self.row_code(row) for row in rows])
+			buf[BOARD_OFFSET:BOARD_OFFSET + len(data)] = data
+			self.board = game.board
+		self.sequence += 1
+		SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, self.sequence)
+
+
+	def row_code(self, row):
+		code = self.row_codes.get(row)
+		if code is None:
+			if len(self.row_codes) > ROW_CACHE_SIZE:
+				self.row_codes.clear()
+			code = self.row_codes[row] = bytes(0 if cell is None else COLORS.index(cell) + 1 for cell in row)
+		return code
+
+
+	def stop(self):
+		if self.memory is not None:
+			self.memory.close()
+			self.memory.unlink()
+			self.memory = None
+
+
+LIVE = LiveStateWriter()
+
+
+def unpack_piece(shape, rotation, x, y, color):
+	if shape == NO_PIECE:
+		return None
+	return (SHAPE_KEYS[shape], rotation, x, y, COLORS[color])
+
+
+class LiveStateReader:
+	"""For overlays, reads the block a game is writing to"""
+
+	def __init__(self, name=NAME):
+		try:
+			self.memory = shared_memory.SharedMemory(name, track=False)
+		except TypeError:
+			# before Python 3.13 the resource tracker would remove the block when this process ends
+			from multiprocessing import resource_tracker
+			self.memory = shared_memory.SharedMemory(name)
+			resource_tracker.unregister(self.memory._name, 'shared_memory')
+		magic, version, self.capacity = HEADER.unpack_from(self.memory.buf, 0)
+		if magic != MAGIC or version != VERSION:
+			raise ValueError('not a live game')
+
+
+	def sequence(self):
+		# changes whenever the game writes, poll this to skip reading the same state again
+		return SEQUENCE.unpack_from(self.memory.buf, SEQUENCE_OFFSET)[0]
+
+
+	def read(self):
+		# returns a LiveState, or None if the game was writing every time it was tried
+		buf = self.memory.buf
+		for i in range(READ_TRIES):
+			before = SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)[0]
+			if before % 2:
+				continue
+			values = STATE.unpack_from(buf, STATE_OFFSET)
+			width, height = values[:2]
+			board = bytes(buf[BOARD_OFFSET:BOARD_OFFSET + width*height])
+			if SEQUENCE.unpack_from(buf, SEQUENCE_OFFSET)[0] == before:
+				return LiveState(before, *values[:7], unpack_piece(*values[7:12]), unpack_piece(*values[12:17]), board)
+		return None
+
+
+	def close(self):
+		self.memory.close()
+
+
+if __name__ == '__main__':
+	reader = LiveStateReader(*sys.argv[1:])
+	last = None
+	while True:
+		sequence = reader.sequence()
+		if sequence != last:
+			state = reader.read()
+			if state is not None:
+				last = state.sequence
+				print('score %5d  level %3d  %6.1f lines/min  falling %-24s next %s' % (
+					state.score, state.level, state.lines_per_minute, state.falling_piece, state.next_piece))
+		time.sleep(1 / 60)
@@ -1,34 +1,70 @@
 #!/usr/bin/env python3
 
+import sys
 import pygame
 
+from audio import AUDIO, pre_init
+from telemetry import TELEMETRY
+from live_state import LIVE
+import render
+
+pre_init()
 pygame.init()
 pygame.mixer.init()
 
 from opening_scene import OpeningScene
+from game_rules import BOARD_SIZE, TALL_BOARD_SIZE
 
 FPS = 30
+RENDERER = 'surface' # or 'texture' to draw with the GPU, see render.py
 SCREEN_WIDTH = 350
 SCREEN_HEIGHT = 530
+UNFOCUSED_FPS = 10 # slow enough to save drawing in the background, fast enough that a frame's ticks stay under MAX_TICKS_PER_UPDATE
+FRAME_DROP = 1.5 # frames taking this many times longer than they should are recorded
 
 
-def main(title, width, height, fps, start_scene):
-	screen = pygame.display.set_mode((width, height))
-	pygame.display.set_caption(title)
+def main(title, width, height, fps, start_scene, renderer=RENDERER):
+	screen = render.open_screen((width, height), title, renderer)
 
 	clock = pygame.time.Clock()
 
+	AUDIO.start()
+	TELEMETRY.start()
+
 	active_scene = start_scene
+	focused = True
+	allowed_events = None
 
 	while active_scene != None:
+		if active_scene.allowed_events is not allowed_events:
+			allowed_events = active_scene.allowed_events
+			pygame.event.set_blocked(None)
+			pygame.event.set_allowed(allowed_events)
+
+		# an idle scene sleeps until there is input instead of drawing the same frame
+		events = []
+		timeout = active_scene.idle_timeout()
+		if timeout is not None:
+			event = pygame.event.wait(timeout)
+			if event.type != pygame.NOEVENT:
+				events.append(event)
+		events.extend(pygame.event.get())
+
 		pressed_keys = pygame.key.get_pressed()
 
 		# event filtering
 		filtered_events = []
 		quit_attempt = False
-		for event in pygame.event.get():
+		exposed = False
+		for event in events:
 			if event.type == pygame.QUIT:
 				quit_attempt = True
+			elif event.type == pygame.WINDOWFOCUSLOST:
+				focused = False
+			elif event.type == pygame.WINDOWFOCUSGAINED:
+				focused = True
+			elif event.type == pygame.WINDOWEXPOSED:
+				exposed = True
 			elif event.type == pygame.KEYDOWN:
 				alt_pressed = pressed_keys[pygame.K_LALT] or pressed_keys[pygame.K_RALT]
 				if event.key == pygame.K_ESCAPE:
@@ -43,13 +79,53 @@ def main(title, width, height, fps, start_scene):
 
 		active_scene.process_inputs(filtered_events, pressed_keys)
 		active_scene.update()
+		active_scene.needs_flip = True
 		active_scene.display(screen)
+		AUDIO.flush()
 
+		# a window that was covered needs the frame again, even if nothing new was drawn
+		if active_scene.needs_flip or exposed:
+			render.present(screen)
+			active_scene.flipped()
 		active_scene = active_scene.next
 
-		pygame.display.flip()
-		clock.tick(fps)
+		rate = fps if focused else UNFOCUSED_FPS
+		clock.tick(rate)
+		# slow frames in the background are meant to be slow
+		if timeout is None and focused and clock.get_time() > 1000 / rate * FRAME_DROP:
+			TELEMETRY.emit('frame_drop', ms=clock.get_time())
+
+	pygame.event.set_allowed(None)
+	TELEMETRY.stop()
+	render.close_screen()
 
 
 if __name__ == "__main__":
-	main("Brick Rain", SCREEN_WIDTH, SCREEN_HEIGHT, FPS, OpeningScene())
+	# python main.py [--texture] [--threaded] [--tall] [--survival] [--live] [puzzle pack] - a pack of puzzles plays those instead
+	# --live shares the game with other processes, see live_state.py
+	args = sys.argv[1:]
+	renderer = RENDERER
+	if '--texture' in args:
+		args.remove('--texture')
+		renderer = 'texture'
+	threaded = '--threaded' in args
+	if threaded:
+		args.remove('--threaded')
+	board_size = BOARD_SIZE
+	if '--tall' in args:
+		args.remove('--tall')
+		board_size = TALL_BOARD_SIZE
+	survival = '--survival' in args
+	if survival:
+		args.remove('--survival')
+	if '--live' in args:
+		args.remove('--live')
+		LIVE.start()
+	if args:
+		from puzzle_scene import PuzzleScene
+		from solver import load_pack
+		start_scene = PuzzleScene(load_pack(args[0]))
+	else:
+		start_scene = OpeningScene(threaded, board_size, survival)
+	main("Brick Rain", SCREEN_WIDTH, SCREEN_HEIGHT, FPS, start_scene, renderer)
+	LIVE.stop()
@@ -5,19 +5,35 @@ import pygame
 import random
 import time
 import json
+import struct
 
-from base_scene import BaseScene
+from base_scene import BaseScene, ALLOWED_EVENTS
 from game_scene import GameScene
+from survival_scene import SurvivalScene
+from game_rules import BOARD_SIZE
+from attract_scene import AttractScene
+from simulation import ThreadedGameScene
+import savegame
 from piece import Piece, COLORS
 from game_resources import IMAGES
+from sprites import get_piece_sprite
+from render import get_screen
+
+
+ATTRACT_DELAY = 30 # seconds without input before the game plays itself
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION)
 
 
 class OpeningScene(BaseScene):
 
 	box_size = 20
+	allowed_events = ALLOWED_EVENTS + (pygame.MOUSEMOTION,) # moving the mouse holds off the attract mode
 
-	def __init__(self):
+	def __init__(self, threaded=False, board_size=BOARD_SIZE, survival=False):
 		super().__init__()
+		self.threaded = threaded # run games with the rules on their own thread
+		self.board_size = board_size
+		self.survival = survival
 
 		self.title = IMAGES['title']
 		self.title_rect = self.title.get_rect()
@@ -36,6 +52,8 @@ class OpeningScene(BaseScene):
 		self.piece_speed = 3
 		self.pieces = []
 
+		self.last_input_time = time.time()
+
 		#self.get_scores()
 
 
@@ -60,16 +78,56 @@ class OpeningScene(BaseScene):
 
 	def new_piece(self):
 		# x with some padding
-		x = random.randint(self.box_size, pygame.display.get_surface().get_rect().width - self.box_size)
+		x = random.randint(self.box_size, get_screen().get_rect().width - self.box_size)
 		y = -self.box_size
 		color = random.choice(COLORS)
-		piece = Piece(self, x, y, '*', color, self.box_size)
+		piece = Piece(x, y, '*', color, self.box_size)
 		return piece
 
 
 	def process_inputs(self, events, pressed_keys):
+		if any(pressed_keys) or any(event.type in INPUT_EVENTS for event in events):
+			self.last_input_time = time.time()
 		if any(pressed_keys) and self.can_begin:
-			self.switch_to_scene(GameScene())
+			self.switch_to_scene(self.get_game())
+		elif time.time() - self.last_input_time >= ATTRACT_DELAY:
+			self.switch_to_scene(AttractScene(self))
+
+
+	def return_from_attract(self):
+		# wait again so the key that stopped the attract mode doesn't start a game
+		self.start_time = time.time()
+		self.last_input_time = time.time()
+		self.switch_to_scene(self)
+
+
+	def get_game(self):
+		if self.survival:
+			scene = SurvivalScene(self.board_size)
+		else:
+			scene = self.get_saved_game()
+		if self.threaded:
+			return ThreadedGameScene(scene)
+		return scene
+
+
+	def get_saved_game(self):
+		# carry on with the saved game if there is one
+		try:
+			board_size, seed, handed_out, snapshot = savegame.load()
+		except OSError:
+			return GameScene(self.board_size)
+		except (ValueError, struct.error):
+			# damaged, or from an older version, so it would fail every time
+			savegame.get_autosaver().clear()
+			return GameScene(self.board_size)
+		if board_size != self.board_size:
+			return GameScene(self.board_size)
+		scene = GameScene(board_size, seed)
+		# the same pieces come next as would have in the saved game
+		scene.queue.skip(handed_out)
+		scene.restore(snapshot)
+		return scene
 
 
 	def draw_scores(self, screen):
@@ -110,7 +168,7 @@ class OpeningScene(BaseScene):
 	def draw_start(self, screen):
 		if not self.gotten_text_center:
 			try:
-				r = pygame.display.get_surface().get_rect()
+				r = get_screen().get_rect()
 				self.text_rect.centerx = r.centerx
 				self.text_rect.centery = 2/3*r.height
 				self.gotten_text_center = True
@@ -122,10 +180,14 @@ class OpeningScene(BaseScene):
 
 	def draw_pieces(self, screen):
 		for piece in self.pieces:
-			piece.draw(screen, piece.x, piece.y)
+			piece.draw(screen, self, piece.x, piece.y)
 
 
 	# required by the pieces
+	def get_piece_sprite(self, piece):
+		return get_piece_sprite(piece)
+
+
 	def draw_box(self, screen, box_x, box_y, color, pixel_x, pixel_y, draw_blank=False):
 		the_rect = (pixel_x, pixel_y, self.box_size, self.box_size)
 		screen.blit(IMAGES[color+' brick'], the_rect)
@@ -141,7 +203,11 @@ class OpeningScene(BaseScene):
 	def update(self):
 		self.generate_pieces()
 		# update pieces
+		height = get_screen().get_rect().height
+		gone = False
 		for piece in self.pieces:
 			piece.y += self.piece_speed
-			if piece.y > pygame.display.get_surface().get_rect().height:
-				self.pieces.remove(piece)
\ No newline at end of file
+			if piece.y > height:
+				gone = True
+		if gone:
+			self.pieces = [piece for piece in self.pieces if piece.y <= height]
\ No newline at end of file
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import random
+from collections import namedtuple
 
 COLORS = ['red', 'blue', 'white', 'black', 'green', 'orange']
 
@@ -16,9 +17,51 @@ SHAPES = {
 	'.': 'o'
 }
 
+# offsets tried in order when a rotation doesn't fit where it is
+WALL_KICKS = ((0, 0), (-1, 0), (1, 0), (0, -1))
+NO_KICKS = ((0, 0),)
+
+# shift_x and shift_y move the piece so it turns around its center
+Rotation = namedtuple('Rotation', 'shape cells width height shift_x shift_y')
+
+_rotations = {}
+
+
+def get_rotations(shape):
+	# all 4 rotations of a shape are worked out once and shared by every piece
+	if isinstance(shape, str):
+		key = shape
+	else:
+		key = tuple(tuple(row) for row in shape)
+	rotations = _rotations.get(key)
+	if rotations is None:
+		rotations = _rotations[key] = _make_rotations(key)
+	return rotations
+
+
+def _make_rotations(shape):
+	if isinstance(shape, str):
+		shape = Piece.to_array(shape)
+	else:
+		shape = [list(row) for row in shape]
+	arrays = [shape]
+	for i in range(3):
+		arrays.append([list(x) for x in zip(*reversed(arrays[-1]))]) # zip & reversed rotates the array
+	rotations = []
+	for i, arr in enumerate(arrays):
+		following = arrays[(i + 1) % len(arrays)]
+		width, height = len(arr[0]), len(arr)
+		cells = tuple((x, y) for y in range(height) for x in range(width) if arr[y][x] is not None)
+		shift_x = width//2 - len(following[0])//2
+		shift_y = height//2 - len(following)//2
+		rotations.append(Rotation(arr, cells, width, height, shift_x, shift_y))
+	return tuple(rotations)
+
 
 class Piece:
 
+	__slots__ = ('x', 'y', 'color', 'rotations', 'rotation', 'box_size')
+
 	@staticmethod
 	def to_array(shape_string, yes='o', no='_', next_row='/'):
 		rows = shape_string.split(next_row)
@@ -41,54 +84,109 @@ class Piece:
 		return arr
 
 
-	# x, y on board, shape is either string or shape key
-	def __init__(self, parent, x, y, shape, color, box_size):
-		self.parent = parent
-
+	# x, y on board, shape is either a shape string or an array
+	def __init__(self, x, y, shape, color, box_size, rotation=0):
 		self.x = x
 		self.y = y
 
 		self.color = color
-		self.shape = shape
+		self.rotations = get_rotations(shape)
+		self.rotation = 0
 
 		self.box_size = box_size
 
+		for i in range(rotation):
+			self.rotate()
+
+
+	@classmethod
+	def from_state(cls, state, box_size):
+		piece = cls.__new__(cls)
+		piece.x, piece.y, piece.rotations, piece.rotation, piece.color = state
+		piece.box_size = box_size
+		return piece
+
+
+	# an immutable copy of the piece, for snapshots
+	def get_state(self):
+		return (self.x, self.y, self.rotations, self.rotation, self.color)
+
 
 	def rotate(self):
-		center = (self.width//2, self.height//2)
-		self.shape = list(list(x) for x in zip(*reversed(self.shape))) # zip & reversed rotates the array
-		new_center = (self.width//2, self.height//2)
-		self.x -= new_center[0] - center[0]
-		self.y -= new_center[1] - center[1]
+		current = self.rotations[self.rotation]
+		self.x += current.shift_x
+		self.y += current.shift_y
+		self.rotation = (self.rotation + 1) % len(self.rotations)
 		return self
 
 
+	# the movement methods only change the piece if the board says it fits
+	def try_move(self, board, dx, dy):
+		if board.fits(self.rotations[self.rotation].cells, self.x + dx, self.y + dy):
+			self.x += dx
+			self.y += dy
+			return True
+		return False
+
+
+	def try_rotate(self, board, kicks=NO_KICKS):
+		current = self.rotations[self.rotation]
+		rotation = (self.rotation + 1) % len(self.rotations)
+		cells = self.rotations[rotation].cells
+		x = self.x + current.shift_x
+		y = self.y + current.shift_y
+		for kick_x, kick_y in kicks:
+			if board.fits(cells, x + kick_x, y + kick_y):
+				self.x = x + kick_x
+				self.y = y + kick_y
+				self.rotation = rotation
+				return True
+		return False
+
+
+	@property
+	def shape(self):
+		return self.rotations[self.rotation].shape
+
+
+	@property
+	def cells(self):
+		return self.rotations[self.rotation].cells
+
+
 	@property
 	def max_size(self):
 		return max([self.width, self.height])
 
 	@property
 	def width(self):
-		return len(self.shape[0])
+		return self.rotations[self.rotation].width
 
 
 	@property
 	def height(self):
-		return len(self.shape)
+		return self.rotations[self.rotation].height
 
 
 	def get_at(self, x, y):
 		return self.shape[y][x]
 
 
-	def draw(self, screen, pixel_x=None, pixel_y=None, draw_blank=False):
+	# parent is the scene that knows how to draw boxes
+	def draw(self, screen, parent, pixel_x=None, pixel_y=None, draw_blank=False):
 		if pixel_x is None and pixel_y is None:
-			pixel_x, pixel_y = self.parent.to_pixel_coords(self.x, self.y)
+			pixel_x, pixel_y = parent.to_pixel_coords(self.x, self.y)
+		if not draw_blank:
+			# the whole piece in one blit if the parent has it cached
+			sprite = parent.get_piece_sprite(self)
+			if sprite is not None:
+				screen.blit(sprite, (pixel_x, pixel_y))
+				return
 		for x in range(self.width):
 			for y in range(self.height):
 				value = self.get_at(x, y)
 				if value or draw_blank:
-					self.parent.draw_box(screen, None, None, self.color, pixel_x + (self.box_size*x), pixel_y + (self.box_size*y), draw_blank)
+					parent.draw_box(screen, None, None, self.color, pixel_x + (self.box_size*x), pixel_y + (self.box_size*y), draw_blank)
 
 
 	# debug:
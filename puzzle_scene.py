@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import pygame
+
+from game_scene import GameScene, NORMAL_FONT, TEXT_COLOR, BOX_SIZE, X_MARGIN, Y_MARGIN
+from audio import AUDIO
+from render import draw_rect, render_text
+import solver
+
+HINT_COLOR = (255, 255, 0)
+
+_pool = None
+
+
+def get_pool():
+	# the solver runs in its own process so a long search never holds up drawing
+	global _pool
+	if _pool is None:
+		_pool = multiprocessing.Pool(1)
+	return _pool
+
+
+class PuzzleScene(GameScene):
+	"""
+	A puzzle from a pack (see solver.py). The board starts with boxes on it
+	and the pieces come in a set order. Clearing every box goes on to the
+	next puzzle, running out of pieces starts the same one again.
+	H asks the solver where the falling piece should go, R restarts.
+	"""
+
+	def __init__(self, puzzles, index=0):
+		self.puzzles = puzzles
+		self.index = index
+		self.puzzle = puzzles[index]
+		board = self.puzzle.board
+		super().__init__((len(board[0]), len(board)), pieces=self.puzzle.pieces)
+		self.board = board
+		self.board_hash = self.calculate_board_hash()
+		self.used = 0 # index of the falling piece in the puzzle's pieces
+
+		self.hint = None # solver.Placement for the falling piece
+		self.hint_result = None # the solver's Result, for the falling piece
+		self.pending = None # hint the solver is still working on
+		self.pending_piece = None
+
+
+	def process_inputs(self, events, pressed_keys):
+		for event in events:
+			if event.type == pygame.KEYDOWN and not (self.paused or self.helping):
+				if event.key == pygame.K_h:
+					self.ask_for_hint()
+				elif event.key == pygame.K_r:
+					self.switch_to_scene(PuzzleScene(self.puzzles, self.index))
+		super().process_inputs(events, pressed_keys)
+
+
+	def ask_for_hint(self):
+		if self.pending is not None or self.hint_result is not None:
+			return
+		self.pending_piece = self.falling_piece
+		self.pending = get_pool().apply_async(solver.solve, (self.board, self.puzzle.pieces[self.used:]))
+
+
+	def update(self):
+		super().update()
+		if self.pending is not None and self.pending.ready():
+			result = self.pending.get()
+			# the piece might have locked while the solver was working
+			if self.pending_piece is self.falling_piece:
+				self.hint_result = result
+				self.hint = result.solution[0] if result.solution else None
+			self.pending = None
+
+
+	def next_turn(self):
+		self.hint = None
+		self.hint_result = None
+		if self.board == self.get_empty_board():
+			AUDIO.play('select', 'ui')
+			# after the last puzzle the pack starts again
+			self.switch_to_scene(PuzzleScene(self.puzzles, (self.index + 1) % len(self.puzzles)))
+			return False
+		self.used += 1
+		if not self.spawn_piece():
+			AUDIO.play('over', 'ui')
+			self.switch_to_scene(PuzzleScene(self.puzzles, self.index))
+			return False
+		return True
+
+
+	def display(self, screen):
+		super().display(screen)
+		if not self.needs_flip or self.paused or self.helping:
+			return
+		if self.hint is not None:
+			piece = solver.placement_piece(self.hint, self.puzzle.pieces[self.used], None, BOX_SIZE)
+			for x, y in piece.cells:
+				pixel_x, pixel_y = self.to_pixel_coords(piece.x + x, piece.y + y)
+				draw_rect(screen, HINT_COLOR, (pixel_x, pixel_y, BOX_SIZE, BOX_SIZE), 2)
+		elif self.pending is not None:
+			self.show_message(screen, 'Thinking...')
+		elif self.hint_result is not None:
+			self.show_message(screen, 'No way out' if self.hint_result.finished else 'Too hard to tell')
+
+
+	def show_message(self, screen, text):
+		surf = render_text(NORMAL_FONT, text, True, TEXT_COLOR)
+		surf_rect = surf.get_rect()
+		surf_rect.midtop = (X_MARGIN + (BOX_SIZE * self.board_width / 2), Y_MARGIN + 5)
+		screen.blit(surf, surf_rect)
+
+
+	def draw_status(self, screen):
+		surf = render_text(NORMAL_FONT, 'Puzzle %s/%s: %s' % (self.index + 1, len(self.puzzles), self.puzzle.name), True, TEXT_COLOR)
+		surf_rect = surf.get_rect()
+		surf_rect.bottomleft = (X_MARGIN, Y_MARGIN-5)
+		screen.blit(surf, surf_rect)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import random
+from collections import deque
+
+from piece import SHAPES, COLORS, get_rotations
+
+# pieces are handed out as (shape id, rotation, color id), indexes into these
+SHAPE_KEYS = list(SHAPES)
+SHAPE_STRINGS = [SHAPES[key] for key in SHAPE_KEYS]
+
+LOOKAHEAD = 5 # pieces generated ahead of time
+
+_shape_ids = {id(get_rotations(shape)): i for i, shape in enumerate(SHAPE_STRINGS)}
+
+
+def get_shape_id(piece):
+	# rotation tables are shared, so they tell which shape a piece is
+	return _shape_ids[id(piece.rotations)]
+
+
+class PureRandom:
+	"""Any shape at any time"""
+
+	def __init__(self, rand):
+		self.rand = rand
+
+
+	def next_shape(self):
+		return self.rand.randrange(len(SHAPE_KEYS))
+
+
+class BagRandom:
+	"""Every shape once (8 with the 1x1 piece) in a shuffled order, then again"""
+
+	def __init__(self, rand):
+		self.rand = rand
+		self.bag = []
+
+
+	def next_shape(self):
+		if not self.bag:
+			self.bag = list(range(len(SHAPE_KEYS)))
+			self.rand.shuffle(self.bag)
+		return self.bag.pop()
+
+
+class HistoryRandom:
+	"""Rerolls a few times if the shape was one of the last few handed out"""
+
+	def __init__(self, rand, history=4, rolls=4):
+		self.rand = rand
+		self.history = deque(maxlen=history)
+		self.rolls = rolls
+
+
+	def next_shape(self):
+		for i in range(self.rolls):
+			shape = self.rand.randrange(len(SHAPE_KEYS))
+			if shape not in self.history:
+				break
+		self.history.append(shape)
+		return shape
+
+
+RANDOMIZERS = {
+	'random': PureRandom,
+	'bag': BagRandom,
+	'history': HistoryRandom,
+}
+
+
+class PieceQueue:
+	"""
+	The upcoming pieces of one game. The same seed and randomizer always
+	give the same pieces.
+	"""
+
+	def __init__(self, randomizer='random', seed=None, lookahead=LOOKAHEAD):
+		if seed is None:
+			seed = random.getrandbits(32)
+		self.seed = seed
+		self.rand = random.Random(seed)
+		self.randomizer = RANDOMIZERS[randomizer](self.rand)
+		self.queue = deque()
+		self.lookahead = lookahead
+		self.handed_out = 0
+		self.fill()
+
+
+	def fill(self):
+		while len(self.queue) < self.lookahead:
+			shape = self.randomizer.next_shape()
+			rotation = self.rand.randrange(4)
+			color = self.rand.randrange(len(COLORS))
+			self.queue.append((shape, rotation, color))
+
+
+	def pop(self):
+		piece = self.queue.popleft()
+		self.handed_out += 1
+		self.fill()
+		return piece
+
+
+	def skip(self, count):
+		# pops until count pieces have been handed out, to carry on a saved game
+		while self.handed_out < count:
+			self.pop()
+
+
+	def peek(self, count=None):
+		if count is None:
+			count = self.lookahead
+		return [self.queue[i] for i in range(min(count, len(self.queue)))]
+
+
+class FixedQueue:
+	"""A set list of shapes handed out in order, for puzzles. pop() gives None once they run out."""
+
+	seed = 0
+
+
+	def __init__(self, shapes):
+		# shapes are keys of SHAPES, colors go by shape so they're always the same
+		self.queue = deque()
+		self.handed_out = 0
+		for key in shapes:
+			shape = SHAPE_KEYS.index(key)
+			self.queue.append((shape, 0, shape % len(COLORS)))
+
+
+	def pop(self):
+		if not self.queue:
+			return None
+		self.handed_out += 1
+		return self.queue.popleft()
+
+
+	def peek(self, count=None):
+		if count is None:
+			count = len(self.queue)
+		return [self.queue[i] for i in range(min(count, len(self.queue)))]
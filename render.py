@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Where scenes draw. A scene's display() gets either the pygame display
+Surface (the 'surface' renderer, drawn in software) or a TextureScreen
+(the 'texture' renderer), which draws with an SDL Renderer so the blitting
+is done by the GPU. Drawing code that works with both only uses blit,
+fill, get_rect, get_size, get_clip and set_clip on the screen, plus
+draw_rect() and render_text() from here.
+
+SDL picks the Renderer's driver, SDL_RENDER_DRIVER=software forces its
+software one for machines without a GPU.
+"""
+
+import sys
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+try:
+	from pygame._sdl2.video import Window, Renderer, Texture
+	from pygame._sdl2.sdl2 import error as SDLError
+except ImportError:
+	Window = Renderer = Texture = None
+	SDLError = pygame.error
+
+RENDERERS = ('surface', 'texture')
+TEXT_CACHE_SIZE = 256 # rendered strings kept around
+
+_screen = None
+_text_cache = OrderedDict()
+_versions = weakref.WeakKeyDictionary()
+
+
+def open_screen(size, title, renderer='surface'):
+	global _screen
+	if renderer == 'texture':
+		if Renderer is None:
+			print('texture renderer needs pygame._sdl2, drawing in software', file=sys.stderr)
+		else:
+			try:
+				_screen = TextureScreen(size, title)
+				return _screen
+			except (pygame.error, SDLError) as error:
+				print('texture renderer not available, drawing in software: %s' % error, file=sys.stderr)
+	_screen = pygame.display.set_mode(size)
+	pygame.display.set_caption(title)
+	return _screen
+
+
+def get_screen():
+	# whatever open_screen made, or the display Surface if something else set it up
+	if _screen is None:
+		return pygame.display.get_surface()
+	return _screen
+
+
+def close_screen():
+	# textures have to be freed while SDL is still running
+	global _screen
+	if isinstance(_screen, TextureScreen):
+		_screen.close()
+	_screen = None
+
+
+def present(screen):
+	if isinstance(screen, TextureScreen):
+		screen.present()
+	else:
+		pygame.display.flip()
+
+
+def new_layer(size):
+	# a surface to draw layers on, in the display's format when there is a display Surface
+	surface = pygame.Surface(size)
+	if pygame.display.get_surface() is not None:
+		surface = surface.convert()
+	return surface
+
+
+def draw_rect(screen, color, rect, width=0):
+	if isinstance(screen, pygame.Surface):
+		pygame.draw.rect(screen, color, rect, width)
+	else:
+		screen.draw_rect(color, rect, width)
+
+
+def render_text(font, text, antialias, color, background=None):
+	# the same text is the same surface each frame, so it's only turned into a texture once
+	key = (font, text, antialias, color, background)
+	surface = _text_cache.get(key)
+	if surface is None:
+		surface = _text_cache[key] = font.render(text, antialias, color, background)
+		if len(_text_cache) > TEXT_CACHE_SIZE:
+			_text_cache.popitem(last=False)
+	else:
+		_text_cache.move_to_end(key)
+	return surface
+
+
+def changed(surface):
+	# surfaces that are drawn on after they've been shown have to say so
+	_versions[surface] = _versions.get(surface, 0) + 1
+
+
+class TextureScreen:
+	"""
+	Looks enough like a Surface for the scenes. Every Surface blitted to it
+	is uploaded as a texture the first time, and again only after changed().
+	"""
+
+	def __init__(self, size, title):
+		self.window = Window(title, size)
+		self.renderer = Renderer(self.window)
+		self.rect = pygame.Rect((0, 0), size)
+		self.clip = self.rect
+		self.textures = weakref.WeakKeyDictionary() # surface -> (texture, version)
+
+
+	def get_rect(self, **kwargs):
+		rect = self.rect.copy()
+		for name, value in kwargs.items():
+			setattr(rect, name, value)
+		return rect
+
+
+	def get_size(self):
+		return self.rect.size
+
+
+	def get_clip(self):
+		return self.clip.copy()
+
+
+	def set_clip(self, rect=None):
+		self.clip = self.rect.clip(rect) if rect is not None else self.rect
+
+
+	def get_texture(self, surface):
+		version = _versions.get(surface, 0)
+		entry = self.textures.get(surface)
+		if entry is None:
+			texture = Texture.from_surface(self.renderer, surface)
+			self.textures[surface] = (texture, version)
+		else:
+			texture, uploaded = entry
+			if uploaded != version:
+				texture.update(surface)
+				self.textures[surface] = (texture, version)
+		return texture
+
+
+	def blit(self, surface, dest, area=None):
+		source = pygame.Rect(area) if area is not None else surface.get_rect()
+		source = source.clip(surface.get_rect())
+		target = pygame.Rect(dest[0], dest[1], source.width, source.height)
+		clipped = target.clip(self.clip)
+		if not clipped.width or not clipped.height:
+			return clipped
+		source = pygame.Rect(source.x + clipped.x - target.x, source.y + clipped.y - target.y, clipped.width, clipped.height)
+		self.get_texture(surface).draw(srcrect=source, dstrect=clipped)
+		return clipped
+
+
+	def fill(self, color, rect=None):
+		rect = self.clip.clip(rect) if rect is not None else self.clip
+		self.renderer.draw_color = pygame.Color(color)
+		self.renderer.fill_rect(rect)
+		return rect
+
+
+	def draw_rect(self, color, rect, width=0):
+		# like pygame.draw.rect, the border is inside the rect
+		rect = pygame.Rect(rect)
+		if width <= 0 or width * 2 >= min(rect.width, rect.height):
+			self.fill(color, rect)
+			return
+		self.fill(color, (rect.x, rect.y, rect.width, width))
+		self.fill(color, (rect.x, rect.bottom - width, rect.width, width))
+		self.fill(color, (rect.x, rect.y + width, width, rect.height - width*2))
+		self.fill(color, (rect.right - width, rect.y + width, width, rect.height - width*2))
+
+
+	def present(self):
+		self.renderer.present()
+
+
+	def close(self):
+		self.textures.clear()
+		self.renderer = None
+		self.window.destroy()
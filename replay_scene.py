@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import pygame
+
+from game_scene import GameScene
+from game_rules import ACTIONS
+from replays import TICK, SOFT_TICK
+
+
+def play_next(replays):
+	# the scene for the next (index row, inputs) of replays, None when there are no more
+	for row, inputs in replays:
+		return ReplayScene(replays, row, inputs)
+	return None
+
+
+class ReplayScene(GameScene):
+	"""
+	Plays a game from the replay archive by feeding its recorded inputs to
+	the rules, a tick at a time, then goes on to the next one. P pauses and
+	N skips to the next game.
+	"""
+
+	autosave = False
+	telemetry = False
+
+
+	def __init__(self, replays, row, inputs):
+		super().__init__((row['width'], row['height']), row['seed'])
+		self.recording = None
+		self.replays = replays
+		self.row = row
+		self.inputs = inputs
+		self.position = 0
+
+
+	def process_inputs(self, events, pressed_keys):
+		for event in events:
+			if event.type == pygame.KEYDOWN:
+				if event.key == pygame.K_p:
+					self.paused = not self.paused
+				elif event.key == pygame.K_n:
+					self.switch_to_scene(play_next(self.replays))
+
+
+	def step(self):
+		inputs = self.inputs
+		while self.position < len(inputs):
+			code = inputs[self.position]
+			self.position += 1
+			if code == TICK or code == SOFT_TICK:
+				return self.fall(code == SOFT_TICK)
+			self.apply_action(ACTIONS[code])
+		# the recording stopped before the game ended
+		self.switch_to_scene(play_next(self.replays))
+		return False
+
+
+	def next_turn(self):
+		if self.spawn_piece():
+			return True
+		self.switch_to_scene(play_next(self.replays))
+		return False
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Keeps every finished game so it can be searched and watched again.
+
+A game is its seed and the inputs it got, one byte each: an ACTIONS index
+for a move and TICK or SOFT_TICK for each fixed time step. The bytes of
+each game are zlib compressed and appended to chunk files. What is known
+about each game goes in an index with one file per column, fixed size
+values one after another, so searches only read the columns they need
+and never decompress a replay. numpy is only needed for searching.
+
+python replays.py find [folder] [filters] - lists matching games
+python replays.py play [folder] [filters] - watches them one after another
+
+Filters are any of:
+	column>value  (or >=, <, <=, =, !=) e.g. lines>50, pieces_I>=10
+	days=N        played in the last N days
+	month         played this calendar month
+	sort=column   biggest first, sort=+column for smallest first
+	limit=N       at most N games (100 by default)
+"""
+
+import os
+import sys
+import time
+import zlib
+import glob
+import queue
+import struct
+import datetime
+import threading
+
+from piece import SHAPES
+from game_rules import ACTIONS
+from randomizer import SHAPE_KEYS, get_shape_id
+from difficulty import TICK_RATE
+
+REPLAY_DIR = 'replays'
+CHUNK_SIZE = 16 * 1024 * 1024 # bytes of compressed replays in a chunk file before starting another
+LIMIT = 100
+
+TICK = len(ACTIONS)
+SOFT_TICK = TICK + 1 # a tick with the piece moving down faster
+ACTION_CODES = {action: i for i, action in enumerate(ACTIONS)}
+
+
+def shape_column(key):
+	return 'pieces_' + ('dot' if key == '.' else key)
+
+
+# name and struct format of each column in the index
+COLUMNS = [
+	('time', 'd'), # when the game ended, seconds since the epoch
+	('seed', 'I'),
+	('width', 'H'),
+	('height', 'H'), # tall boards don't fit in a byte
+	('score', 'I'),
+	('level', 'H'),
+	('lines', 'I'),
+	('ticks', 'I'), # how long the game was, TICK_RATE to a second
+	('chunk', 'H'), # where the compressed inputs are
+	('offset', 'Q'),
+	('size', 'I'),
+] + [(shape_column(key), 'H') for key in SHAPES] # pieces locked of each shape
+
+NUMPY_TYPES = {'d': '<f8', 'Q': '<u8', 'I': '<u4', 'H': '<u2', 'B': 'u1'}
+
+_writer = None
+
+
+class Recording:
+	"""The inputs of a game being played, and counts for the index"""
+
+	def __init__(self, seed, board_size):
+		self.seed = seed
+		self.board_size = board_size
+		self.codes = bytearray()
+		self.ticks = 0
+		self.lines = 0
+		self.pieces = [0] * len(SHAPE_KEYS)
+
+
+	def action(self, action):
+		self.codes.append(ACTION_CODES[action])
+
+
+	def tick(self, soft_drop):
+		self.codes.append(SOFT_TICK if soft_drop else TICK)
+		self.ticks += 1
+
+
+	def locked(self, piece, lines):
+		self.pieces[get_shape_id(piece)] += 1
+		self.lines += lines
+
+
+class Archive:
+	"""Adds games to a replay folder, keeping its files open"""
+
+	def __init__(self, folder=REPLAY_DIR):
+		self.folder = folder
+		os.makedirs(folder, exist_ok=True)
+		self.columns = [(name, struct.Struct('<' + fmt), open(column_path(folder, name), 'ab')) for name, fmt in COLUMNS]
+		chunks = chunk_paths(folder)
+		self.chunk = len(chunks) - 1 if chunks else 0
+		self.chunk_file = open(chunk_path(folder, self.chunk), 'ab')
+
+
+	def add(self, recording, score, level, ended=None):
+		data = zlib.compress(bytes(recording.codes))
+		if self.chunk_file.tell() + len(data) > CHUNK_SIZE and self.chunk_file.tell() > 0:
+			self.chunk_file.close()
+			self.chunk += 1
+			self.chunk_file = open(chunk_path(self.folder, self.chunk), 'ab')
+		offset = self.chunk_file.tell()
+		self.chunk_file.write(data)
+		self.chunk_file.flush()
+
+		width, height = recording.board_size
+		row = {
+			'time': time.time() if ended is None else ended,
+			'seed': recording.seed,
+			'width': width,
+			'height': height,
+			'score': score,
+			'level': level,
+			'lines': recording.lines,
+			'ticks': recording.ticks,
+			'chunk': self.chunk,
+			'offset': offset,
+			'size': len(data),
+		}
+		for key, count in zip(SHAPE_KEYS, recording.pieces):
+			row[shape_column(key)] = count
+		# packed before anything is written, so a bad value can't leave the columns different lengths
+		values = [packer.pack(row[name]) for name, packer, file in self.columns]
+		# the replay is written before its row, so a row always has its replay
+		for (name, packer, file), value in zip(self.columns, values):
+			file.write(value)
+			file.flush()
+
+
+	def close(self):
+		self.chunk_file.close()
+		for name, packer, file in self.columns:
+			file.close()
+
+
+def column_path(folder, name):
+	return os.path.join(folder, name + '.col')
+
+
+def chunk_path(folder, chunk):
+	return os.path.join(folder, 'chunk-%05d.bin' % chunk)
+
+
+def chunk_paths(folder):
+	return sorted(glob.glob(os.path.join(folder, 'chunk-*.bin')))
+
+
+def save(recording, score, level):
+	# finished games are added by a background thread so the game loop never waits on the disk
+	global _writer
+	if _writer is None:
+		_writer = ArchiveWriter()
+	_writer.put((recording, score, level, time.time()))
+
+
+class ArchiveWriter(queue.Queue):
+
+	def __init__(self, folder=REPLAY_DIR):
+		super().__init__()
+		self.folder = folder
+		thread = threading.Thread(target=self.run, daemon=True)
+		thread.start()
+
+
+	def run(self):
+		archive = Archive(self.folder)
+		while True:
+			record = self.get()
+			try:
+				archive.add(*record)
+			except (OSError, struct.error, zlib.error) as error:
+				# lose this game rather than every game after it
+				print('replay not saved: %s' % error, file=sys.stderr)
+
+
+class Index:
+	"""
+	The columns of a replay folder as numpy arrays. They are memory mapped,
+	so opening an index of millions of games reads nothing until searched.
+	"""
+
+	def __init__(self, folder=REPLAY_DIR):
+		import numpy as np
+		self.folder = folder
+		self.columns = {}
+		for name, fmt in COLUMNS:
+			path = column_path(folder, name)
+			if not os.path.exists(path) or os.path.getsize(path) == 0:
+				self.columns[name] = np.zeros(0, NUMPY_TYPES[fmt])
+			else:
+				self.columns[name] = np.memmap(path, NUMPY_TYPES[fmt], 'r')
+		# a game being added when the files were read might not have all its columns yet
+		self.count = min(len(column) for column in self.columns.values())
+
+
+	def __len__(self):
+		return self.count
+
+
+	def __getitem__(self, name):
+		return self.columns[name][:self.count]
+
+
+	def find(self, conditions=(), sort=None, descending=True, limit=LIMIT):
+		"""
+		Returns the rows matching all the conditions, (column, operator, value)
+		tuples, sorted by a column.
+		"""
+		import numpy as np
+		mask = np.ones(self.count, bool)
+		for name, operator, value in conditions:
+			mask &= OPERATORS[operator](self[name], value)
+		rows = np.flatnonzero(mask)
+		if sort is None:
+			return rows[-limit:] if limit else rows # the newest
+		keys = self[sort][rows]
+		if descending:
+			keys = -keys.astype(np.float64)
+		if limit and limit < len(rows):
+			# only the best few need sorting
+			best = np.argpartition(keys, limit - 1)[:limit]
+			return rows[best[np.argsort(keys[best], kind='stable')]]
+		return rows[np.argsort(keys, kind='stable')]
+
+
+	def row(self, i):
+		return {name: self[name][i].item() for name, fmt in COLUMNS}
+
+
+	def inputs(self, i):
+		with open(chunk_path(self.folder, int(self['chunk'][i])), 'rb') as file:
+			file.seek(int(self['offset'][i]))
+			return zlib.decompress(file.read(int(self['size'][i])))
+
+
+OPERATORS = {
+	'>': lambda column, value: column > value,
+	'>=': lambda column, value: column >= value,
+	'<': lambda column, value: column < value,
+	'<=': lambda column, value: column <= value,
+	'=': lambda column, value: column == value,
+	'!=': lambda column, value: column != value,
+}
+
+
+def parse_filters(args):
+	# returns conditions, sort column, descending, limit
+	conditions = []
+	sort = None
+	descending = True
+	limit = LIMIT
+	names = dict(COLUMNS)
+	for arg in args:
+		if arg == 'month':
+			start = datetime.date.today().replace(day=1)
+			conditions.append(('time', '>=', time.mktime(start.timetuple())))
+		elif arg.startswith('days='):
+			conditions.append(('time', '>=', time.time() - float(arg[5:]) * 86400))
+		elif arg.startswith('sort='):
+			sort = arg[5:]
+			if sort[:1] in ('+', '-'):
+				descending = sort[0] == '-'
+				sort = sort[1:]
+			if sort not in names:
+				raise ValueError('no column %r' % sort)
+		elif arg.startswith('limit='):
+			limit = int(arg[6:])
+		else:
+			# the longest operators are tried first so >= isn't read as >
+			for operator in sorted(OPERATORS, key=len, reverse=True):
+				name, found, value = arg.partition(operator)
+				if found:
+					break
+			else:
+				raise ValueError('not a filter: %r' % arg)
+			if name not in names:
+				raise ValueError('no column %r' % name)
+			conditions.append((name, operator, float(value)))
+	return conditions, sort, descending, limit
+
+
+def find(folder, filters):
+	# filters as parse_filters() returns them
+	index = Index(folder)
+	start = time.perf_counter()
+	rows = index.find(*filters)
+	took = time.perf_counter() - start
+	print('%8s  %-16s %6s %5s %5s %7s %10s' % ('game', 'ended', 'score', 'level', 'lines', 'time', 'seed'))
+	for i in rows:
+		row = index.row(i)
+		ended = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['time']))
+		print('%8d  %-16s %6d %5d %5d %6.0fs %10d' % (i, ended, row['score'], row['level'], row['lines'], row['ticks'] / TICK_RATE, row['seed']))
+	print('%d of %d games in %.1f ms' % (len(rows), len(index), took * 1000))
+
+
+def play(folder, filters):
+	# plays the matching games, oldest first unless sorted, until they run out
+	index = Index(folder)
+	rows = index.find(*filters)
+	if not len(rows):
+		print('no games match')
+		return
+	replays = ((index.row(i), index.inputs(i)) for i in rows)
+	import main
+	from replay_scene import play_next
+	main.main('Brick Rain replays', main.SCREEN_WIDTH, main.SCREEN_HEIGHT, main.FPS, play_next(replays))
+
+
+if __name__ == '__main__':
+	command = sys.argv[1] if len(sys.argv) > 1 else None
+	args = sys.argv[2:]
+	folder = REPLAY_DIR
+	if args and os.path.isdir(args[0]):
+		folder = args.pop(0)
+	if command not in ('find', 'play'):
+		print(__doc__)
+		sys.exit()
+	try:
+		filters = parse_filters(args)
+	except ValueError as error:
+		print('%s\n%s' % (error, __doc__), file=sys.stderr)
+		sys.exit(2)
+	if command == 'find':
+		find(folder, filters)
+	else:
+		play(folder, filters)
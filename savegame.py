@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Saves games in progress in a small binary format.
+
+Every record is:
+	header    magic, version, board width and height
+	state     seed, score, level, falling piece and next piece, pieces handed out
+	occupancy 1 bit per box, row by row
+	colors    3 bits per box, 0 for empty, otherwise 1 + index in COLORS
+Records of the same board size are all the same length, so a file of
+many records can be read with SaveFile without decoding the others.
+"""
+
+import os
+import sys
+import math
+import mmap
+import struct
+import threading
+
+from game_rules import Snapshot
+from piece import COLORS, get_rotations
+from randomizer import SHAPE_STRINGS, get_shape_id
+
+MAGIC = b'BRKS'
+VERSION = 2
+SAVE_FILE = 'savegame.bin'
+
+HEADER = struct.Struct('<4sBBH') # magic, version, width, height
+STATE = struct.Struct('<IIH' + 'BBhhB'*2 + 'I') # seed, score, level, 2x piece, pieces handed out
+NO_PIECE = 255
+
+_rotations = [get_rotations(shape) for shape in SHAPE_STRINGS]
+_autosaver = None
+
+
+def record_size(width, height):
+	boxes = width * height
+	return HEADER.size + STATE.size + (boxes + 7) // 8 + (boxes*3 + 7) // 8
+
+
+def pack_piece(piece):
+	if piece is None:
+		return (NO_PIECE, 0, 0, 0, 0)
+	return (get_shape_id(piece), piece.rotation, piece.x, piece.y, COLORS.index(piece.color))
+
+
+def unpack_piece(shape, rotation, x, y, color):
+	if shape == NO_PIECE:
+		return None
+	if shape >= len(_rotations) or rotation >= len(_rotations[shape]) or color >= len(COLORS):
+		raise ValueError('saved game is damaged')
+	return (x, y, _rotations[shape], rotation, COLORS[color])
+
+
+def pack_state(state):
+	# a piece as Piece.get_state() gives it
+	if state is None:
+		return (NO_PIECE, 0, 0, 0, 0)
+	x, y, rotations, rotation, color = state
+	return (_rotations.index(rotations), rotation, x, y, COLORS.index(color))
+
+
+def encode(game):
+	return encode_state((game.board_width, game.board_height), game.queue.seed, game.queue.handed_out, game.snapshot())
+
+
+def encode_state(board_size, seed, handed_out, snapshot):
+	width, height = board_size
+	empty_row = (None,) * width
+	# a few rows at a time, so each group ends on a byte and the ints never grow past a few rows
+	group = 8 // math.gcd(width, 8)
+	occupancy = bytearray()
+	colors = bytearray()
+	for top in range(0, height, group):
+		occupied = 0
+		colored = 0
+		i = 0
+		for row in snapshot.board[top:top + group]:
+			# most rows of a tall board are empty
+			if row == empty_row:
+				i += width
+				continue
+			for cell in row:
+				if cell is not None:
+					occupied |= 1 << i
+					colored |= (COLORS.index(cell) + 1) << (i*3)
+				i += 1
+		occupancy += occupied.to_bytes((i + 7) // 8, 'little')
+		colors += colored.to_bytes((i*3 + 7) // 8, 'little')
+	return b''.join([
+		HEADER.pack(MAGIC, VERSION, width, height),
+		STATE.pack(seed, snapshot.score, snapshot.level,
+			*pack_state(snapshot.falling_piece), *pack_state(snapshot.next_piece), handed_out),
+		occupancy,
+		colors,
+	])
+
+
+def decode(data, offset=0):
+	"""
+	Returns the board size, seed, pieces handed out by the queue and a
+	GameRules Snapshot (with a board_hash of None, restore() works it out).
+	Raises ValueError if the record isn't a whole, undamaged saved game.
+	"""
+	if len(data) - offset < HEADER.size:
+		raise ValueError('not a saved game')
+	magic, version, width, height = HEADER.unpack_from(data, offset)
+	if magic != MAGIC:
+		raise ValueError('not a saved game')
+	if version != VERSION:
+		raise ValueError('saved game version %s is not supported' % version)
+	if len(data) - offset < record_size(width, height):
+		raise ValueError('saved game is cut short')
+	offset += HEADER.size
+	values = STATE.unpack_from(data, offset)
+	offset += STATE.size
+	seed, score, level = values[:3]
+
+	boxes = width * height
+	offset += (boxes + 7) // 8 # colors say which boxes are filled too
+	colors = int.from_bytes(data[offset:offset + (boxes*3 + 7) // 8], 'little')
+	board = []
+	for y in range(height):
+		row = []
+		for x in range(width):
+			color = colors & 7
+			colors >>= 3
+			if color > len(COLORS):
+				raise ValueError('saved game is damaged')
+			row.append(COLORS[color-1] if color else None)
+		board.append(tuple(row))
+
+	snapshot = Snapshot(tuple(board), None, unpack_piece(*values[3:8]), unpack_piece(*values[8:13]), score, level)
+	return (width, height), seed, values[13], snapshot
+
+
+def read_occupancy(data, offset=0):
+	# just the filled boxes as an int, bit (y*width + x)
+	magic, version, width, height = HEADER.unpack_from(data, offset)
+	start = offset + HEADER.size + STATE.size
+	return int.from_bytes(data[start:start + (width*height + 7) // 8], 'little')
+
+
+def write_atomic(path, data):
+	# a power cut leaves either the old file or the new one, never half of one
+	temp = path + '.tmp'
+	with open(temp, 'wb') as file:
+		file.write(data)
+		file.flush()
+		os.fsync(file.fileno())
+	os.replace(temp, path)
+
+
+def save(game, path=SAVE_FILE):
+	write_atomic(path, encode(game))
+
+
+def load(path=SAVE_FILE):
+	with open(path, 'rb') as file:
+		return decode(file.read())
+
+
+def append(game, path):
+	# for building files of many states
+	with open(path, 'ab') as file:
+		file.write(encode(game))
+
+
+def get_autosaver():
+	# one thread does all the saving
+	global _autosaver
+	if _autosaver is None:
+		_autosaver = AutoSaver()
+	return _autosaver
+
+
+class AutoSaver:
+	"""
+	Saves from a background thread so the game loop never waits on the disk,
+	or on encoding. Only the newest state waiting to be saved is kept.
+	"""
+
+	def __init__(self, path=SAVE_FILE):
+		self.path = path
+		self.state = None # encode_state() arguments
+		self.delete = False
+		self.condition = threading.Condition()
+		thread = threading.Thread(target=self.run, daemon=True)
+		thread.start()
+
+
+	def save(self, game):
+		# snapshots are immutable, so the saving thread can encode one while the game carries on
+		state = ((game.board_width, game.board_height), game.queue.seed, game.queue.handed_out, game.snapshot())
+		with self.condition:
+			self.state = state
+			self.delete = False
+			self.condition.notify()
+
+
+	def clear(self):
+		with self.condition:
+			self.state = None
+			self.delete = True
+			self.condition.notify()
+
+
+	def run(self):
+		while True:
+			with self.condition:
+				while self.state is None and not self.delete:
+					self.condition.wait()
+				state, delete = self.state, self.delete
+				self.state, self.delete = None, False
+			if delete:
+				if os.path.exists(self.path):
+					os.remove(self.path)
+			else:
+				write_atomic(self.path, encode_state(*state))
+
+
+class SaveFile:
+	"""Reads a file of many records through mmap"""
+
+	def __init__(self, path):
+		self.file = open(path, 'rb')
+		self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, version, width, height = HEADER.unpack_from(self.map, 0)
+		self.board_size = (width, height)
+		self.record_size = record_size(width, height)
+
+
+	def __len__(self):
+		return len(self.map) // self.record_size
+
+
+	def __getitem__(self, i):
+		if not 0 <= i < len(self):
+			raise IndexError(i)
+		return decode(self.map, i * self.record_size)
+
+
+	def occupancy(self, i):
+		return read_occupancy(self.map, i * self.record_size)
+
+
+	def scores(self):
+		# reads one field from every record without decoding the boards
+		offset = HEADER.size + 4
+		return [struct.unpack_from('<I', self.map, i*self.record_size + offset)[0] for i in range(len(self))]
+
+
+	def close(self):
+		self.map.close()
+		self.file.close()
+
+
+if __name__ == '__main__':
+	# python savegame.py states.bin - prints a summary of a file of records
+	saves = SaveFile(sys.argv[1])
+	scores = saves.scores()
+	filled = [bin(saves.occupancy(i)).count('1') for i in range(len(saves))]
+	print('%d states, board %sx%s' % (len(saves), *saves.board_size))
+	if scores:
+		print('score: mean %.1f, max %d' % (sum(scores) / len(scores), max(scores)))
+		print('filled boxes: mean %.1f, max %d' % (sum(filled) / len(filled), max(filled)))
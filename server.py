@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Runs matches on a server that has the real copy of every game.
+
+python server.py serve [port]
+python server.py loadtest [matches] [seconds]
+
+Clients send and get one JSON message per line. To join:
+	{"type": "join", "match": "name", "play": true}
+Players then send {"type": "input", "action": "left"} (see game_rules.ACTIONS).
+Everyone gets {"type": "state", ...} messages, up to SEND_RATE a second,
+and answers each with {"type": "ack", "seq": seq}. Each state message only
+has the board rows that changed since the last state the client acknowledged.
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+from collections import deque
+
+from game_rules import GameRules, ACTIONS
+from piece import COLORS
+from randomizer import get_shape_id
+from difficulty import TICK_RATE
+
+SEND_RATE = 30 # state messages per second, the rules tick at TICK_RATE
+TICKS_PER_SEND = TICK_RATE // SEND_RATE
+PLAYERS = 2 # per match
+MAX_UNACKED = 60 # states remembered per client while waiting for acks
+MAX_WRITE_BUFFER = 64 * 1024 # skip slow clients instead of buffering forever
+
+_color_ids = {color: str(i) for i, color in enumerate(COLORS)}
+
+
+def encode_row(row):
+	# one character per box, '.' for empty, otherwise the color id
+	return ''.join('.' if cell is None else _color_ids[cell] for cell in row)
+
+
+def decode_row(text):
+	return tuple(None if c == '.' else COLORS[int(c)] for c in text)
+
+
+class Player:
+
+	def __init__(self, seed):
+		self.game = GameRules(seed=seed)
+		self.inputs = deque()
+		self.over = False
+
+
+	def tick(self):
+		# returns how many lines were cleared
+		game = self.game
+		while self.inputs:
+			game.apply_action(self.inputs.popleft())
+		removed_lines = game.tick()
+		if removed_lines is None:
+			return 0
+		self.over = not game.spawn_piece()
+		return removed_lines
+
+
+	def state_key(self):
+		game = self.game
+		piece = game.falling_piece
+		return (game.board, piece.rotations, piece.rotation, piece.x, piece.y, game.score, self.over)
+
+
+class Connection:
+
+	def __init__(self, reader, writer, match, player):
+		self.reader = reader
+		self.writer = writer
+		self.match = match
+		self.player = player # index into match.players, None for spectators
+		self.seq = 0
+		self.sent = {} # seq -> boards sent
+		self.acked = [None] * len(match.players)
+		self.last_sent = None
+
+
+	def ack(self, seq):
+		boards = self.sent.get(seq)
+		if boards is None:
+			return
+		self.acked = boards
+		for old in [s for s in self.sent if s <= seq]:
+			del self.sent[old]
+
+
+	def send_state(self):
+		if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+			return # catches up from its last ack later
+		# most ticks nothing moves, so there is nothing to send
+		current = [player.state_key() for player in self.match.players]
+		if current == self.last_sent:
+			return
+		self.last_sent = current
+		players = []
+		boards = []
+		for i, player in enumerate(self.match.players):
+			game = player.game
+			acked = self.acked[i]
+			rows = {}
+			for y, row in enumerate(game.board):
+				# rows are replaced when they change, so this is usually a pointer compare
+				if acked is None or row is not acked[y] and row != acked[y]:
+					rows[y] = encode_row(row)
+			piece = game.falling_piece
+			players.append({
+				'rows': rows,
+				'piece': [get_shape_id(piece), piece.rotation, piece.x, piece.y, COLORS.index(piece.color)],
+				'score': game.score,
+				'level': game.level,
+				'over': player.over,
+			})
+			boards.append(game.board)
+		self.seq += 1
+		self.sent[self.seq] = boards
+		if len(self.sent) > MAX_UNACKED:
+			del self.sent[min(self.sent)]
+		self.write({'type': 'state', 'seq': self.seq, 'tick': self.match.ticks, 'players': players})
+
+
+	def write(self, message):
+		self.writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+
+
+class Match:
+
+	def __init__(self, name, seed=None):
+		if seed is None:
+			seed = random.getrandbits(32)
+		self.name = name
+		self.seed = seed
+		self.rand = random.Random(seed)
+		# everyone gets the same pieces
+		self.players = [Player(seed) for i in range(PLAYERS)]
+		self.connections = []
+		self.taken = [False] * PLAYERS
+		self.full = asyncio.Event() # set once every seat is taken
+		self.ticks = 0
+		self.task = None
+
+
+	@property
+	def over(self):
+		return sum(not player.over for player in self.players) <= (1 if PLAYERS > 1 else 0)
+
+
+	def tick(self):
+		for n in range(TICKS_PER_SEND):
+			self.ticks += 1
+			for i, player in enumerate(self.players):
+				if player.over:
+					continue
+				removed_lines = player.tick()
+				if removed_lines > 1:
+					self.send_garbage(i, removed_lines - 1)
+		for connection in self.connections:
+			connection.send_state()
+
+
+	def send_garbage(self, sender, count):
+		gap = self.rand.randrange(self.players[sender].game.board_width)
+		for i, player in enumerate(self.players):
+			if i != sender and not player.over:
+				# pushed out the top, over just like a piece that can't spawn
+				if not player.game.add_garbage(count, gap):
+					player.over = True
+
+
+	async def run(self):
+		# pieces only start falling once everyone is there to play them
+		await self.full.wait()
+		interval = 1 / SEND_RATE
+		next_tick = time.monotonic()
+		while not self.over:
+			self.tick()
+			next_tick += interval
+			await asyncio.sleep(max(0, next_tick - time.monotonic()))
+		for connection in self.connections:
+			connection.write({'type': 'over', 'scores': [player.game.score for player in self.players]})
+
+
+class Server:
+
+	def __init__(self):
+		self.matches = {}
+
+
+	def get_match(self, name):
+		match = self.matches.get(name)
+		if match is None or match.over:
+			match = self.matches[name] = Match(name)
+			match.task = asyncio.ensure_future(match.run())
+
+			def finished(task):
+				if self.matches.get(name) is match:
+					del self.matches[name]
+			match.task.add_done_callback(finished)
+		return match
+
+
+	async def handle(self, reader, writer):
+		connection = None
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				message = json.loads(line)
+				kind = message.get('type')
+				if kind == 'join' and connection is None:
+					match = self.get_match(message['match'])
+					player = None
+					if message.get('play') and False in match.taken:
+						player = match.taken.index(False)
+						match.taken[player] = True
+						if all(match.taken):
+							match.full.set()
+					connection = Connection(reader, writer, match, player)
+					match.connections.append(connection)
+					connection.write({'type': 'joined', 'player': player, 'seed': match.seed})
+				elif kind == 'input' and connection is not None and connection.player is not None:
+					if message.get('action') in ACTIONS:
+						connection.match.players[connection.player].inputs.append(message['action'])
+				elif kind == 'ack' and connection is not None:
+					connection.ack(message['seq'])
+		except (ConnectionError, ValueError, KeyError):
+			pass
+		finally:
+			if connection is not None:
+				connection.match.connections.remove(connection)
+			writer.close()
+
+
+	async def serve(self, host='127.0.0.1', port=8765):
+		return await asyncio.start_server(self.handle, host, port)
+
+
+class RemoteGame:
+	"""A client's copy of the players in a match, built from the deltas"""
+
+	def __init__(self):
+		self.players = []
+
+
+	def apply(self, message):
+		for i, update in enumerate(message['players']):
+			if i == len(self.players):
+				self.players.append({'board': {}})
+			player = self.players[i]
+			for y, text in update['rows'].items():
+				player['board'][int(y)] = decode_row(text)
+			player['piece'] = update['piece']
+			player['score'] = update['score']
+			player['level'] = update['level']
+			player['over'] = update['over']
+
+
+async def client(host, port, match, play=True, actions=None, rand=None):
+	"""
+	A loopback client for testing. It plays random moves if actions is None.
+	Returns its RemoteGame once the match is over.
+	"""
+	rand = rand or random.Random()
+	reader, writer = await asyncio.open_connection(host, port)
+
+	def send(message):
+		writer.write(json.dumps(message).encode() + b'\n')
+
+	send({'type': 'join', 'match': match, 'play': play})
+	remote = RemoteGame()
+	try:
+		while True:
+			line = await reader.readline()
+			if not line:
+				break
+			message = json.loads(line)
+			if message['type'] == 'state':
+				remote.apply(message)
+				send({'type': 'ack', 'seq': message['seq']})
+				if play and rand.random() < .3:
+					send({'type': 'input', 'action': rand.choice(actions or ACTIONS)})
+			elif message['type'] == 'over':
+				break
+	finally:
+		writer.close()
+	return remote
+
+
+async def loadtest(matches, seconds, port=8765):
+	server = Server()
+	listener = await server.serve(port=port)
+	clients = []
+	for i in range(matches):
+		for j in range(PLAYERS):
+			clients.append(asyncio.ensure_future(client('127.0.0.1', port, f'match {i}', rand=random.Random(i*PLAYERS + j))))
+	start = time.monotonic()
+	await asyncio.sleep(seconds)
+	ticks = sum(match.ticks for match in server.matches.values())
+	finished = sum(task.done() for task in clients)
+	print('%d matches, %.0f match ticks per second (target %d), %d clients finished' % (
+		matches, ticks / (time.monotonic() - start), matches * TICK_RATE, finished))
+	for task in clients:
+		task.cancel()
+	await asyncio.gather(*clients, return_exceptions=True)
+	listener.close()
+	await listener.wait_closed()
+	for match in list(server.matches.values()):
+		match.task.cancel()
+	await asyncio.sleep(.1) # let the server see the clients hang up
+
+
+if __name__ == '__main__':
+	command = sys.argv[1] if len(sys.argv) > 1 else 'serve'
+	if command == 'loadtest':
+		matches = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+		seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+		asyncio.run(loadtest(matches, seconds))
+	else:
+		port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+		async def serve_forever():
+			listener = await Server().serve('0.0.0.0', port)
+			async with listener:
+				await listener.serve_forever()
+		asyncio.run(serve_forever())
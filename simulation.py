@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Runs a GameScene's rules on a thread of their own, so a flip() held up by
+vsync or the display driver never holds up gravity or input.
+
+The simulation thread ticks at TICK_RATE and after every tick publishes a
+RenderState, an immutable copy of what is needed to draw the game, into
+the back one of two slots and then makes it the front one. The drawing
+thread only reads the front slot, so neither thread waits on the other.
+Input events go to the simulation thread through a queue.
+"""
+
+import time
+import queue
+import threading
+from collections import namedtuple
+
+import pygame
+
+from base_scene import BaseScene
+from game_scene import GameScene, TICK_TIME, IDLE_TIMEOUT
+from game_over_scene import GameOverScene
+from piece import Piece
+from live_state import LIVE
+
+# pieces are Piece.get_state() tuples, or None
+RenderState = namedtuple('RenderState', 'board falling_piece next_piece score level paused helping')
+
+
+class ThreadedGameScene(BaseScene):
+	"""
+	Stands in for a GameScene in the main loop. The game is only touched by
+	the simulation thread, and drawing is done by a second GameScene, the
+	view, set up from the latest RenderState. The clouds are only for show,
+	so they belong to the view.
+	"""
+
+	def __init__(self, game):
+		super().__init__()
+		self.game = game
+		self.view = GameScene((game.board_width, game.board_height))
+		self.inputs = queue.Queue()
+		self.states = [None, None]
+		self.front = 0
+		self.publish()
+		self.drawn_state = None
+		self.stopping = threading.Event()
+		self.thread = None # started on the first update, so scenes that are only made stay idle
+
+
+	def publish(self):
+		game = self.game
+		falling = game.falling_piece.get_state() if game.falling_piece is not None else None
+		next_piece = game.next_piece.get_state() if game.next_piece is not None else None
+		back = 1 - self.front
+		self.states[back] = RenderState(game.board, falling, next_piece, game.score, game.level, game.paused, game.helping)
+		self.front = back
+
+
+	def get_state(self):
+		return self.states[self.front]
+
+
+	def run(self):
+		game = self.game
+		next_tick = time.perf_counter()
+		while not self.stopping.is_set() and game.next is game:
+			while True:
+				try:
+					events, pressed_keys = self.inputs.get_nowait()
+				except queue.Empty:
+					break
+				game.process_inputs(events, pressed_keys)
+			# the game keeps its own fixed time steps, this just calls it about once a tick
+			game.update_rules()
+			self.publish()
+			LIVE.publish(game)
+			next_tick += TICK_TIME
+			delay = next_tick - time.perf_counter()
+			if delay > 0:
+				self.stopping.wait(delay)
+			else:
+				next_tick = time.perf_counter()
+
+
+	def stop(self):
+		self.stopping.set()
+		if self.thread is not None and self.thread is not threading.current_thread():
+			self.thread.join()
+
+
+	def process_inputs(self, events, pressed_keys):
+		state = self.get_state()
+		for event in events:
+			if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not (state.paused or state.helping):
+				self.view.clouds.click(event.pos)
+		self.inputs.put((events, pressed_keys))
+
+
+	def update(self):
+		if self.thread is None:
+			self.thread = threading.Thread(target=self.run, daemon=True)
+			self.thread.start()
+
+		game = self.game
+		if game.next is not game:
+			# the game ended on the simulation thread
+			self.stop()
+			next_scene = game.next
+			if isinstance(next_scene, GameOverScene):
+				next_scene.retry_scene = ThreadedGameScene(next_scene.retry_scene)
+			self.switch_to_scene(next_scene)
+			return
+
+		state = self.get_state()
+		if not (state.paused or state.helping):
+			self.view.update_clouds()
+
+
+	def idle_timeout(self):
+		state = self.get_state()
+		if state.paused or state.helping:
+			return IDLE_TIMEOUT
+		return None
+
+
+	def display(self, screen):
+		state = self.get_state()
+		view = self.view
+		if state is not self.drawn_state:
+			view.board = state.board
+			view.falling_piece = Piece.from_state(state.falling_piece, view.box_size) if state.falling_piece is not None else None
+			view.next_piece = Piece.from_state(state.next_piece, view.box_size) if state.next_piece is not None else None
+			view.score = state.score
+			view.level = state.level
+			view.paused = state.paused
+			view.helping = state.helping
+			self.drawn_state = state
+		view.display(screen)
+		self.needs_flip = view.needs_flip
+
+
+	def terminate(self):
+		self.stop()
+		super().terminate()
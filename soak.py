@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Plays the game over and over without a window to check memory stays flat.
+
+Each cycle waits on the title screen, starts a game, drops pieces until
+game over, retries once, and goes back to the title screen after the second
+game over. A virtual clock stands in for time in the scenes, so games go
+as fast as they can be drawn. After some warm up cycles (for caches to
+fill) memory is tracked with tracemalloc, and the run fails if more than
+the budget is still allocated at the end.
+
+python soak.py [cycles] [budget in KB] [warm up cycles]
+"""
+
+import gc
+import os
+import sys
+import random
+import tempfile
+import tracemalloc
+from collections import Counter
+
+from headless import init_pygame, use_virtual_clock
+
+CYCLES = 1000
+BUDGET = 512 # KB allowed to stay allocated after all the cycles
+WARMUP = 20
+REPORT_EVERY = 100
+
+GAMES_PER_CYCLE = 2
+TITLE_FRAMES = 60 # frames on the title screen before pressing a key
+FRAME_TIME = 1/6 # virtual seconds a frame takes, as much as a GameScene update catches up on
+DROP_EVERY = 3 # frames between hard drops
+MAX_GAME_FRAMES = 20000 # a game taking longer than this is stuck
+
+
+def count_objects():
+	# objects the garbage collector knows about, by type name
+	return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+class Soak:
+
+	def __init__(self, seed=0):
+		self.screen = init_pygame()
+		import pygame
+		import opening_scene
+		from game_over_scene import GameOverScene
+		from audio import AUDIO
+		self.pygame = pygame
+		self.GameOverScene = GameOverScene
+		self.audio = AUDIO
+
+		self.clock = use_virtual_clock()
+		# autosaves go somewhere they can't replace a real saved game
+		os.chdir(tempfile.mkdtemp(prefix='brick-soak-'))
+
+		self.rand = random.Random(seed)
+		self.title = opening_scene.OpeningScene()
+		self.frames = 0
+		self.games = 0
+
+
+	def key(self, key):
+		return self.pygame.event.Event(self.pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0)
+
+
+	def cycle(self):
+		pygame = self.pygame
+		move_keys = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP)
+		title = self.title
+		title.return_from_attract()
+		scene = title
+		frames = 0
+		game_frames = 0
+		games = 0
+		while True:
+			events = []
+			pressed_keys = (0,)
+			if scene is title:
+				if frames >= TITLE_FRAMES:
+					pressed_keys = (1,)
+			elif isinstance(scene, self.GameOverScene):
+				games += 1
+				game_frames = 0
+				if games == GAMES_PER_CYCLE:
+					break
+				events.append(self.key(pygame.K_r))
+			else:
+				events.append(self.key(self.rand.choice(move_keys)))
+				if frames % DROP_EVERY == 0:
+					events.append(self.key(pygame.K_SPACE))
+				game_frames += 1
+				if game_frames > MAX_GAME_FRAMES:
+					raise RuntimeError('game never ended')
+
+			scene.process_inputs(events, pressed_keys)
+			scene.update()
+			scene.display(self.screen)
+			self.audio.flush()
+			scene = scene.next
+			self.clock.advance(FRAME_TIME)
+			frames += 1
+		self.frames += frames
+		self.games += games
+
+
+def soak(cycles=CYCLES, budget=BUDGET, warmup=WARMUP):
+	# returns True if memory stayed within budget
+	runner = Soak()
+	for i in range(warmup):
+		runner.cycle()
+
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	counts_before = count_objects()
+	for i in range(1, cycles + 1):
+		runner.cycle()
+		if i % REPORT_EVERY == 0 or i == cycles:
+			gc.collect()
+			print('cycle %6d  games %7d  frames %9d  still allocated %8.1f KB' % (
+				i, runner.games, runner.frames, tracemalloc.get_traced_memory()[0] / 1024), flush=True)
+
+	gc.collect()
+	growth = tracemalloc.get_traced_memory()[0]
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+	counts_after = count_objects()
+
+	print('\nbiggest growth by line:')
+	for stat in after.compare_to(before, 'lineno')[:10]:
+		if stat.size_diff > 0:
+			print('  %s' % stat)
+	print('\nbiggest growth by type:')
+	for name, count in (counts_after - counts_before).most_common(10):
+		print('  %-30s +%d' % (name, count))
+
+	ok = growth <= budget * 1024
+	print('\n%s: %.1f KB still allocated after %d cycles, budget %d KB' % (
+		'ok' if ok else 'FAILED', growth / 1024, cycles, budget))
+	return ok
+
+
+if __name__ == '__main__':
+	args = [int(arg) for arg in sys.argv[1:]]
+	sys.exit(0 if soak(*args) else 1)
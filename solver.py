@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Puzzles: a board with boxes already on it and a set list of pieces, to be
+placed so that every box is cleared away. Finishing with pieces left over
+is fine.
+
+The solver tries every place each piece can be moved to with the game's
+own moves and collision rules, looking for the shortest solution first
+(iterative deepening). Boards it has already found to be dead ends are
+remembered by their Zobrist hash, and it gives up after a number of boards
+or seconds.
+
+python solver.py pack.json [more packs] - checks every puzzle can be solved, using every core
+"""
+
+import sys
+import json
+import time
+import multiprocessing
+from collections import namedtuple
+
+from game_rules import GameRules, BOARD_SIZE, GARBAGE_COLOR
+from piece import Piece, SHAPES, COLORS, get_rotations
+
+MAX_NODES = 200000 # boards looked at before giving up
+MAX_TIME = 10 # seconds before giving up
+OPEN_ROWS = 8 # empty rows below where pieces appear that leave room to turn any piece
+
+# letters for the boxes on puzzle boards, anything else that isn't '.' is garbage
+COLOR_LETTERS = {color[0]: color for color in COLORS if color != 'black'}
+COLOR_LETTERS['k'] = 'black'
+
+Puzzle = namedtuple('Puzzle', 'name board pieces')
+
+# where to drop a piece from, rotation is how many times it was turned
+Placement = namedtuple('Placement', 'rotation x y')
+
+# solution is a list of Placements or None, finished is False if the search ran out of budget
+Result = namedtuple('Result', 'solution nodes finished')
+
+
+def parse_board(rows, board_size=BOARD_SIZE):
+	# rows are strings for the bottom of the board, with '.' for empty boxes
+	width, height = board_size
+	if len(rows) > height or any(len(row) != width for row in rows):
+		raise ValueError('puzzle board must fit in %sx%s' % board_size)
+	board = [(None,) * width] * (height - len(rows))
+	for row in rows:
+		board.append(tuple(None if c == '.' else COLOR_LETTERS.get(c, GARBAGE_COLOR) for c in row))
+	return tuple(board)
+
+
+def load_pack(path, board_size=BOARD_SIZE):
+	"""
+	A pack is a JSON file like
+		{"name": "...", "puzzles": [{"name": "...", "board": ["..rr..", ...], "pieces": "TIO"}, ...]}
+	"""
+	with open(path) as file:
+		data = json.load(file)
+	puzzles = []
+	for entry in data['puzzles']:
+		for key in entry['pieces']:
+			if key not in SHAPES:
+				raise ValueError('puzzle %r has unknown piece %r' % (entry['name'], key))
+		puzzles.append(Puzzle(entry['name'], parse_board(entry['board'], board_size), entry['pieces']))
+	return puzzles
+
+
+def get_placements(game, shape):
+	"""
+	Every place a piece of the shape can land on the game's board, found by
+	trying the moves a player has from where the piece appears. Places that
+	cover the same boxes are only given once.
+	"""
+	piece = Piece(int(game.board_width / 2), -2, SHAPES[shape], None, game.box_size)
+	rotations = piece.rotations
+	if not game.fits(rotations[0].cells, piece.x, piece.y):
+		return []
+	top = game.board_height
+	for y, row in enumerate(game.board):
+		if row.count(None) != game.board_width:
+			top = y
+			break
+	if top - piece.y >= OPEN_ROWS:
+		# in the open above the highest box the piece can be turned and moved anywhere,
+		# so start from every way it can be just above there instead of moving it down
+		todo = []
+		for rotation, current in enumerate(rotations):
+			y = top - current.height
+			for x in range(-current.width, game.board_width):
+				if game.fits(current.cells, x, y):
+					todo.append((x, y, rotation))
+	else:
+		todo = [(piece.x, piece.y, 0)]
+	seen = set(todo)
+	landed = {}
+	while todo:
+		x, y, rotation = todo.pop()
+		current = rotations[rotation]
+		if not game.fits(current.cells, x, y + 1):
+			boxes = frozenset((x + cell_x, y + cell_y) for cell_x, cell_y in current.cells)
+			# landing partly above the board would lose boxes and end the game
+			if min(box_y for box_x, box_y in boxes) >= 0 and boxes not in landed:
+				landed[boxes] = Placement(rotation, x, y)
+		turned = (rotation + 1) % len(rotations)
+		for move in ((x - 1, y, rotation), (x + 1, y, rotation), (x, y + 1, rotation),
+				(x + current.shift_x, y + current.shift_y, turned)):
+			if move not in seen and game.fits(rotations[move[2]].cells, move[0], move[1]):
+				seen.add(move)
+				todo.append(move)
+	return list(landed.values())
+
+
+def placement_piece(placement, shape, color, box_size):
+	# the piece where a placement puts it (making a Piece with a rotation would move it)
+	return Piece.from_state((placement.x, placement.y, get_rotations(SHAPES[shape]), placement.rotation, color), box_size)
+
+
+class OutOfBudget(Exception):
+	pass
+
+
+class Solver:
+
+	def __init__(self, board, pieces, max_nodes=MAX_NODES, max_time=MAX_TIME):
+		self.game = GameRules((len(board[0]), len(board)), pieces=())
+		self.game.board = board
+		self.game.board_hash = self.game.calculate_board_hash()
+		self.empty = self.game.get_empty_board()
+		self.pieces = pieces
+		self.sizes = [len(Piece(0, 0, SHAPES[key], None, 0).cells) for key in pieces]
+		self.filled = sum(cell is not None for row in board for cell in row)
+		self.max_nodes = max_nodes
+		self.deadline = time.perf_counter() + max_time
+		self.nodes = 0
+		# (board hash, pieces used) -> most pieces left that still weren't enough
+		self.dead = {}
+
+
+	def solve(self):
+		if self.game.board == self.empty:
+			return Result([], 0, True)
+		try:
+			for depth in range(1, len(self.pieces) + 1):
+				solution = self.search(0, depth, self.filled)
+				if solution is not None:
+					return Result(solution, self.nodes, True)
+		except OutOfBudget:
+			return Result(None, self.nodes, False)
+		return Result(None, self.nodes, True)
+
+
+	def can_empty(self, index, depth, filled):
+		# boxes only go away a whole row at a time
+		width = self.game.board_width
+		for size in self.sizes[index:depth]:
+			filled += size
+			if filled % width == 0:
+				return True
+		return False
+
+
+	def search(self, index, depth, filled):
+		game = self.game
+		left = depth - index
+		key = (game.board_hash, index)
+		if self.dead.get(key, 0) >= left or not self.can_empty(index, depth, filled):
+			return None
+		self.nodes += 1
+		if self.nodes > self.max_nodes or (self.nodes % 1000 == 0 and time.perf_counter() > self.deadline):
+			raise OutOfBudget()
+
+		board, board_hash = game.board, game.board_hash
+		size = self.sizes[index]
+		children = []
+		for placement in get_placements(game, self.pieces[index]):
+			game.board, game.board_hash = board, board_hash
+			game.falling_piece = placement_piece(placement, self.pieces[index], GARBAGE_COLOR, game.box_size)
+			# lock_piece would change the score and level too
+			game.add_to_board(game.falling_piece)
+			lines = game.remove_complete_lines()
+			children.append((lines, placement.y, placement, game.board, game.board_hash))
+		# clearing lines and staying low usually works out, so try those first
+		children.sort(key=lambda child: (-child[0], -child[1]))
+
+		for lines, y, placement, child_board, child_hash in children:
+			if child_board == self.empty:
+				return [placement]
+			if left > 1:
+				game.board, game.board_hash = child_board, child_hash
+				rest = self.search(index + 1, depth, filled + size - lines * game.board_width)
+				if rest is not None:
+					return [placement] + rest
+		game.board, game.board_hash = board, board_hash
+		self.dead[key] = left
+		return None
+
+
+def solve(board, pieces, max_nodes=MAX_NODES, max_time=MAX_TIME):
+	return Solver(board, pieces, max_nodes, max_time).solve()
+
+
+def solve_puzzle(puzzle):
+	# for Pool.map, which needs a function it can find by name
+	start = time.perf_counter()
+	result = solve(puzzle.board, puzzle.pieces)
+	return puzzle.name, result, time.perf_counter() - start
+
+
+def validate(paths, processes=None):
+	# returns how many puzzles couldn't be shown to have a solution
+	puzzles = []
+	for path in paths:
+		puzzles.extend(load_pack(path))
+	with multiprocessing.Pool(processes) as pool:
+		results = pool.map(solve_puzzle, puzzles, chunksize=1)
+	bad = 0
+	for name, result, seconds in results:
+		if result.solution is not None:
+			status = 'solved in %d' % len(result.solution)
+		elif result.finished:
+			status = 'NO SOLUTION'
+			bad += 1
+		else:
+			status = 'GAVE UP'
+			bad += 1
+		print('%-30s %-14s %8d boards %6.2fs' % (name, status, result.nodes, seconds))
+	return bad
+
+
+if __name__ == '__main__':
+	if len(sys.argv) < 2:
+		print(__doc__)
+	else:
+		sys.exit(1 if validate(sys.argv[1:]) else 0)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+from collections import OrderedDict
+
+import pygame
+
+from piece import SHAPES, COLORS
+from game_resources import IMAGES
+
+# every shape, rotation and color at two box sizes, so sprites of a size no longer used get dropped
+CACHE_SIZE = 2 * len(SHAPES) * 4 * len(COLORS)
+
+_sprites = OrderedDict()
+
+
+def get_piece_sprite(piece):
+	# the whole piece as one surface, drawn brick by brick the first time it's needed
+	# rotation tables are shared and never freed, so their ids can be keys
+	key = (id(piece.rotations), piece.rotation, piece.color, piece.box_size)
+	sprite = _sprites.get(key)
+	if sprite is None:
+		sprite = _sprites[key] = make_sprite(piece.rotations[piece.rotation], IMAGES[piece.color+' brick'], piece.box_size)
+		if len(_sprites) > CACHE_SIZE:
+			_sprites.popitem(last=False)
+	else:
+		_sprites.move_to_end(key)
+	return sprite
+
+
+def make_sprite(rotation, brick, box_size):
+	brick_width, brick_height = brick.get_size()
+	size = (box_size*(rotation.width - 1) + brick_width, box_size*(rotation.height - 1) + brick_height)
+	sprite = pygame.Surface(size, pygame.SRCALPHA)
+	sprite.fill((0, 0, 0, 0))
+	for x, y in rotation.cells:
+		sprite.blit(brick, (box_size*x, box_size*y))
+	return sprite
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import random
+
+from game_scene import GameScene
+from game_rules import BOARD_SIZE
+
+
+class SurvivalScene(GameScene):
+	"""
+	Garbage rows with one gap push up from the bottom, sooner the higher
+	the level (see difficulty.GARBAGE_DELAY). The game ends when a piece
+	can't come in or boxes are pushed off the top.
+	"""
+
+	autosave = False
+
+	def __init__(self, board_size=BOARD_SIZE, seed=None):
+		super().__init__(board_size, seed)
+		self.recording = None # replays don't know about the garbage
+		self.gaps = random.Random(self.queue.seed)
+		self.garbage_ticks = 0
+
+
+	def step(self):
+		self.garbage_ticks += 1
+		if self.garbage_ticks >= self.speed.garbage_delay:
+			self.garbage_ticks = 0
+			if not self.add_garbage(1, self.gaps.randrange(self.board_width)):
+				self.end_game()
+				return False
+		return super().step()
+
+
+	def retry_scene(self):
+		return SurvivalScene((self.board_width, self.board_height))
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Records what happens in games without slowing the game loop down.
+
+Events go into a ring buffer in memory. A background thread writes them
+out in batches to rotating NDJSON files or an SQLite database.
+
+python telemetry.py stats [files or folder] - stats for each session
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import uuid
+import sqlite3
+import threading
+from collections import deque, defaultdict
+
+TELEMETRY_DIR = 'telemetry'
+BUFFER_SIZE = 10000 # events kept in memory, the oldest are dropped when full
+FLUSH_INTERVAL = 2 # seconds between writes
+MAX_FILE_SIZE = 5 * 1024 * 1024
+MAX_FILES = 20
+
+
+class NDJSONSink:
+	"""One JSON object per line, starting a new file when one gets too big"""
+
+	def __init__(self, folder):
+		self.folder = folder
+		self.file = None
+		os.makedirs(folder, exist_ok=True)
+
+
+	def write(self, events):
+		if self.file is None or self.file.tell() > MAX_FILE_SIZE:
+			self.rotate()
+		self.file.write(''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in events))
+		self.file.flush()
+
+
+	def rotate(self):
+		if self.file is not None:
+			self.file.close()
+		name = time.strftime('events-%Y%m%d-%H%M%S') + '-%s.ndjson' % uuid.uuid4().hex[:6]
+		self.file = open(os.path.join(self.folder, name), 'a')
+		old = sorted(glob.glob(os.path.join(self.folder, 'events-*.ndjson')))
+		for path in old[:-MAX_FILES]:
+			os.remove(path)
+
+
+	def close(self):
+		if self.file is not None:
+			self.file.close()
+
+
+class SQLiteSink:
+
+	def __init__(self, folder):
+		os.makedirs(folder, exist_ok=True)
+		self.db = sqlite3.connect(os.path.join(folder, 'events.db'), check_same_thread=False)
+		self.db.execute('CREATE TABLE IF NOT EXISTS events (session TEXT, time REAL, type TEXT, data TEXT)')
+
+
+	def write(self, events):
+		with self.db:
+			self.db.executemany('INSERT INTO events VALUES (?, ?, ?, ?)',
+				[(e['session'], e['time'], e['type'], json.dumps(e)) for e in events])
+
+
+	def close(self):
+		self.db.close()
+
+
+SINKS = {
+	'ndjson': NDJSONSink,
+	'sqlite': SQLiteSink,
+}
+
+
+class Telemetry:
+
+	def __init__(self, size=BUFFER_SIZE):
+		self.buffer = deque(maxlen=size)
+		self.session = uuid.uuid4().hex
+		self.enabled = False
+		self.sink = None
+		self.stopping = threading.Event()
+		self.thread = None
+
+
+	def start(self, folder=TELEMETRY_DIR, kind='ndjson'):
+		self.sink = SINKS[kind](folder)
+		self.enabled = True
+		self.stopping.clear() # it might have been stopped before
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+		self.emit('session_start')
+
+
+	def emit(self, kind, **data):
+		# deque.append is thread safe and never waits
+		if self.enabled:
+			data['session'] = self.session
+			data['time'] = time.time()
+			data['type'] = kind
+			self.buffer.append(data)
+
+
+	def drain(self):
+		events = []
+		while True:
+			try:
+				events.append(self.buffer.popleft())
+			except IndexError:
+				break
+		if events:
+			self.sink.write(events)
+
+
+	def run(self):
+		while not self.stopping.wait(FLUSH_INTERVAL):
+			self.drain()
+		self.drain()
+
+
+	def stop(self):
+		if self.thread is None:
+			return
+		self.emit('session_end')
+		self.stopping.set()
+		self.thread.join()
+		self.sink.close()
+		self.enabled = False
+
+
+TELEMETRY = Telemetry()
+
+
+def read_events(paths):
+	for path in paths:
+		if os.path.isdir(path):
+			yield from read_events(sorted(glob.glob(os.path.join(path, 'events-*.ndjson'))) + glob.glob(os.path.join(path, '*.db')))
+		elif path.endswith('.db'):
+			db = sqlite3.connect(path)
+			for (data,) in db.execute('SELECT data FROM events ORDER BY time'):
+				yield json.loads(data)
+			db.close()
+		else:
+			with open(path) as file:
+				for line in file:
+					if line.strip():
+						yield json.loads(line)
+
+
+def session_stats(events):
+	sessions = defaultdict(lambda: defaultdict(int))
+	for event in events:
+		stats = sessions[event['session']]
+		stats['start'] = min(stats.get('start', event['time']), event['time'])
+		stats['end'] = max(stats.get('end', event['time']), event['time'])
+		kind = event['type']
+		if kind == 'lock':
+			stats['pieces'] += 1
+			stats['lines'] += event.get('lines', 0)
+		elif kind == 'game_over':
+			stats['games'] += 1
+			stats['best_score'] = max(stats['best_score'], event.get('score', 0))
+		elif kind == 'level_up':
+			stats['max_level'] = max(stats['max_level'], event.get('level', 0))
+		elif kind == 'frame_drop':
+			stats['frame_drops'] += 1
+	return sessions
+
+
+def print_stats(paths):
+	sessions = session_stats(read_events(paths or [TELEMETRY_DIR]))
+	print('%-12s %8s %6s %6s %10s %10s %6s' % ('session', 'minutes', 'games', 'best', 'pieces/min', 'lines/min', 'drops'))
+	for session, stats in sorted(sessions.items(), key=lambda item: item[1]['start']):
+		minutes = max(stats['end'] - stats['start'], 1) / 60
+		print('%-12s %8.1f %6d %6d %10.1f %10.2f %6d' % (session[:12], minutes, stats['games'], stats['best_score'],
+			stats['pieces'] / minutes, stats['lines'] / minutes, stats['frame_drops']))
+
+
+if __name__ == '__main__':
+	if len(sys.argv) > 1 and sys.argv[1] == 'stats':
+		print_stats(sys.argv[2:])
+	else:
+		print(__doc__)